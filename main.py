@@ -8,21 +8,55 @@
 
 """Conversion from eigenfrequency to indexes of the capacity boxes."""
 
-from scripts.analysis.find_best_capacity_index import compute_index
+from scripts import parameters
+from scripts.analysis.find_best_capacity_index import compute_index, enumerate_capacities
+from scripts.capacity_boxes import capacity_box_1, capacity_box_2, capacity_box_3
 from scripts.compute_values.eigenfrequency_capacity import compute_capacity_for_given_eigenfrequency
-from scripts.parameters import computed_params
+from scripts.frequency_cache import FrequencyCache
 from scripts.utils import transform_frequency
 
 
+frequency_cache = FrequencyCache()
+
+
+def compute_settings(eigenfrequency_value):
+    """Compute the capacity, the box indexes and the message for the given eigenfrequency.
+
+    All the values are read from `scripts.parameters` on each call, and the capacities table is enumerated from the
+    current box lists if they differ from the ones of 'data/capacities.csv', so that the results match the fingerprint
+    of `frequency_cache`.
+
+    Parameters
+    ----------
+    eigenfrequency_value: float
+
+    Returns
+    -------
+    out: tuple
+        The capacity, the numerical values and the message of `compute_index`, and the hrf value.
+    """
+    capacity = compute_capacity_for_given_eigenfrequency(eigenfrequency_value, parameters.computed_params,
+                                                         parameters.inductance)
+    box_lists = tuple(tuple(box_list) for box_list in (parameters.capacity_box_1_list, parameters.capacity_box_2_list,
+                                                       parameters.capacity_box_3_list))
+    if box_lists == tuple(tuple(box.capacity_list) for box in (capacity_box_1, capacity_box_2, capacity_box_3)):
+        # The capacities table on disk was computed for these boxes
+        capacity_table = None
+    else:
+        capacity_table = enumerate_capacities(box_lists)
+    numerical_values, message = compute_index(capacity, capacity_table=capacity_table)
+    hrf = transform_frequency(eigenfrequency_value)
+
+    return capacity, numerical_values, message, hrf
+
+
 def main(eigenfrequency_value):
 
-    capacity = compute_capacity_for_given_eigenfrequency(eigenfrequency_value, computed_params)
+    capacity, numerical_values, message, hrf = frequency_cache.get(eigenfrequency_value, compute_settings)
     print(f'For the given eigenfrequency of {eigenfrequency_value}, the desired capacity is: {capacity}\n')
-    numerical_values, message = compute_index(capacity)
 
     print(message)
 
-    hrf = transform_frequency(eigenfrequency_value)
     print(f'hrf = {str(hrf)}')
 
     return numerical_values, message
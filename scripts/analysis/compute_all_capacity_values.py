@@ -9,22 +9,91 @@
 """Compute all the capacities values allowed by the experimental setup."""
 
 
+import numpy as np
+
 from scripts.capacity_boxes import capacity_box_1, capacity_box_2, capacity_box_3
-from scripts.compute_values.capacities import compute_capacity
-from scripts.utils import save_capacities_data_to_file
+from scripts.compute_values.capacities import combine_box_capacities_exact, exact_capacity_sort_key, \
+    exact_capacity_to_float
+from scripts.utils import save_capacities_data_to_columnar_file, save_capacities_data_to_file
+
+
+def enumerate_combinations(boxes=(capacity_box_1, capacity_box_2, capacity_box_3)):
+    """Enumerate all the (c1, c2, c3, serial) combinations of the capacity boxes.
+
+    The order is the one of nested loops over c1, c2, c3 and serial, the last one varying fastest.
+
+    Parameters
+    ----------
+    boxes: tuple, optional
+        The three CapacityBoxes instances.
+        Defaults to the boxes defined in `scripts.capacity_boxes`.
+
+    Returns
+    -------
+    out: tuple
+        Tuple of int ndarrays (c1, c2, c3, serial).
+    """
+    grid = np.meshgrid(*(np.arange(box.max_index) for box in boxes), np.arange(2), indexing='ij')
+    return tuple(axis.ravel() for axis in grid)
+
+
+def unique_combinations(boxes=(capacity_box_1, capacity_box_2, capacity_box_3)):
+    """Enumerate the combinations of the boxes and keep one for each distinct capacity.
+
+    The capacities are compared exactly, see `combine_box_capacities_exact`. As for a dictionary filled in the order
+    of `enumerate_combinations`, the distinct capacities are in the order of their first occurrence and the last
+    combination reaching each of them is kept.
+
+    Parameters
+    ----------
+    boxes: tuple, optional
+        The three CapacityBoxes instances.
+
+    Returns
+    -------
+    numerator: ndarray
+    denominator: ndarray
+        Exact capacities [pF], as numerator / denominator.
+    connection_data: ndarray
+        Array of shape (len(numerator), 4) containing the indexes for the capacity boxes and the connection type.
+    """
+    combinations = enumerate_combinations(boxes)
+    c1, c2, c3, serial = combinations
+    numerator, denominator = combine_box_capacities_exact(boxes[0].index_to_picofarad_array(c1),
+                                                          boxes[1].index_to_picofarad_array(c2),
+                                                          boxes[2].index_to_picofarad_array(c3), serial)
+
+    key, _ = exact_capacity_sort_key(numerator, denominator)
+    order = np.lexsort((np.arange(len(key)), denominator, numerator, key))
+    exact = np.column_stack((numerator, denominator))[order]
+    is_first = np.ones(len(order), dtype=bool)
+    is_first[1:] = np.any(exact[1:] != exact[:-1], axis=1)
+    is_last = np.append(is_first[1:], True)
+
+    first = order[is_first]
+    last = order[is_last]
+    occurrence = np.argsort(first, kind='stable')
+
+    connection_data = np.column_stack(combinations)[last[occurrence]]
+    return numerator[first[occurrence]], denominator[first[occurrence]], connection_data
 
 
-def compute_all_possible_capacities():
-    """Compute all the experimental possible capacities from the values at hand."""
-    data = dict()
+def compute_all_possible_capacities(file_format='csv'):
+    """Compute all the experimental possible capacities from the values at hand.
 
-    for val_c1 in range(capacity_box_1.max_index):
-        for val_c2 in range(capacity_box_2.max_index):
-            for val_c3 in range(capacity_box_3.max_index):
-                for serial in [0, 1]:
-                    data[compute_capacity(val_c1, val_c2, val_c3, serial=serial)] = (val_c1, val_c2, val_c3, serial)
+    Parameters
+    ----------
+    file_format: str, optional
+        Either 'csv', or one of the columnar formats of `save_columns_to_file`.
+        Defaults to 'csv'.
+    """
+    numerator, denominator, connection_data = unique_combinations()
+    data = dict(zip(exact_capacity_to_float(numerator, denominator).tolist(), map(tuple, connection_data.tolist())))
 
-    save_capacities_data_to_file(data, '../../data/capacities.csv')
+    if file_format == 'csv':
+        save_capacities_data_to_file(data, '../../data/capacities.csv')
+    else:
+        save_capacities_data_to_columnar_file(data, '../../data/capacities', file_format)
 
 
 if __name__ == '__main__':
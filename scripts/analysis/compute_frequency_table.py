@@ -8,11 +8,57 @@
 import csv
 from copy import deepcopy
 
+import numpy as np
+
 from scripts.analysis.find_best_capacity_index import compute_index
+from scripts.analysis.joint_coil_search import compute_pair_index
 from scripts.compute_values.eigenfrequency_capacity import compute_capacity_for_given_eigenfrequency
-from scripts.utils import transform_frequency
+from scripts.utils import save_columns_to_file, transform_frequency
 from scripts.parameters import h_planck_constant, length, mass_neutron, n_digits, wavelength
 
+# Column names of the frequency table.
+frequency_table_header = [
+    'echotime',
+    'cbox1_coil1_c1',
+    'cbox1_coil1_c1c2serial',
+    'cbox1_coil1_c2',
+    'cbox1_coil1_c3',
+    'cbox1_coil1_transformer',
+    'cbox1_coil2_c1',
+    'cbox1_coil2_c1c2serial',
+    'cbox1_coil2_c2',
+    'cbox1_coil2_c3',
+    'cbox1_coil2_transformer',
+    'cbox1_diplexer',
+    'cbox1_fg_freq',
+    'cbox1_power_divider',
+    'cbox1_reg_amp',
+    'cbox2_coil1_c1',
+    'cbox2_coil1_c1c2serial',
+    'cbox2_coil1_c2',
+    'cbox2_coil1_c3',
+    'cbox2_coil1_transformer',
+    'cbox2_coil2_c1',
+    'cbox2_coil2_c1c2serial',
+    'cbox2_coil2_c2',
+    'cbox2_coil2_c3',
+    'cbox2_coil2_transformer',
+    'cbox2_diplexer',
+    'cbox2_fg_freq',
+    'cbox2_power_divider',
+    'cbox2_reg_amp',
+    'hrf1',
+    'hrf2',
+    'hsf1',
+    'hsf2',
+    'psd_chop_freq',
+    'psd_timebin_freq',
+    'sf1',
+    'sf2']
+
+# Factor between the mieze time and the echotime column of the frequency table.
+echo_time_scale = 100000000
+
 
 def save_data_to_file(data, file_name, extension='.csv'):
     """Save data to file."""
@@ -32,18 +78,37 @@ def save_data_to_file(data, file_name, extension='.csv'):
             csv_writer.writerow(row)
 
 
-def compute_frequency2_from_frequency1(frequency1):
+def save_frequency_table_to_columnar_file(rows, file_name, file_format='npz'):
+    """Save the frequency table to a columnar file, with the columns of `frequency_table_header`.
+
+    Parameters
+    ----------
+    rows: list
+        Rows of the frequency table.
+    file_name: str
+    file_format: str, optional
+        See `save_columns_to_file`.
+        Defaults to 'npz'.
+    """
+    values = np.asarray(rows, dtype=float).reshape(-1, len(frequency_table_header))
+    columns = {name: values[:, i] for i, name in enumerate(frequency_table_header)}
+    return save_columns_to_file(columns, file_name, file_format)
+
+
+def compute_frequency2_from_frequency1(frequency1, prefactor=1.2):
     """Compute the second frequency from the first one.
 
     Parameters
     ----------
-    frequency1: int, float
+    frequency1: int, float, ndarray
+    prefactor: float, optional
+        Ratio between the second and the first frequency.
+        Defaults to 1.2.
 
     Returns
     -------
-    frequency2: int, float
+    frequency2: int, float, ndarray
     """
-    prefactor = 1.2
     return prefactor * frequency1
 
 
@@ -82,140 +147,159 @@ def mieze_time(chopping_frequency_value):
     return ((mass_neutron/h_planck_constant) ** 2) * (wavelength ** 3) * chopping_frequency_value * length
 
 
-def main():
-    """Generate the frequency table."""
-
-    with open('../../data/generated_table_data.csv', mode='w') as generated_table_data:
-        table_data_writer = csv.writer(generated_table_data, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-
-        table_data_writer.writerow(
-            ['echotime',
-             'cbox1_coil1_c1',
-             'cbox1_coil1_c1c2serial',
-             'cbox1_coil1_c2',
-             'cbox1_coil1_c3',
-             'cbox1_coil1_transformer',
-             'cbox1_coil2_c1',
-             'cbox1_coil2_c1c2serial',
-             'cbox1_coil2_c2',
-             'cbox1_coil2_c3',
-             'cbox1_coil2_transformer',
-             'cbox1_diplexer',
-             'cbox1_fg_freq',
-             'cbox1_power_divider',
-             'cbox1_reg_amp',
-             'cbox2_coil1_c1',
-             'cbox2_coil1_c1c2serial',
-             'cbox2_coil1_c2',
-             'cbox2_coil1_c3',
-             'cbox2_coil1_transformer',
-             'cbox2_coil2_c1',
-             'cbox2_coil2_c1c2serial',
-             'cbox2_coil2_c2',
-             'cbox2_coil2_c3',
-             'cbox2_coil2_transformer',
-             'cbox2_diplexer',
-             'cbox2_fg_freq',
-             'cbox2_power_divider',
-             'cbox2_reg_amp',
-             'hrf1',
-             'hrf2',
-             'hsf1',
-             'hsf2',
-             'psd_chop_freq',
-             'psd_timebin_freq',
-             'sf1',
-             'sf2'])
-
-        cbox1_coil1_transformer = 0
-        cbox1_coil2_c1 = 0
-        cbox1_coil2_c1c2serial = 0
-        cbox1_coil2_c2 = 0
-        cbox1_coil2_c3 = 0
-        cbox1_coil2_transformer = 0
-        cbox1_diplexer = 0
-        cbox1_power_divider = 0
-        cbox1_reg_amp = 1.6
-        cbox2_coil1_transformer = 0
-        cbox2_coil2_c1 = 0
-        cbox2_coil2_c1c2serial = 0
-        cbox2_coil2_c2 = 0
-        cbox2_coil2_c3 = 0
-        cbox2_coil2_transformer = 0
-        cbox2_diplexer = 0
-        cbox2_power_divider = 0
-        cbox2_reg_amp = 1.6
-        hsf1 = 0.4
-        hsf2 = 0.4
-        sf1 = 1.1
-        sf2 = 1.1
-
-        frequency1 = 30000
-
-        while frequency1 < 1000000:
-            print(frequency1)
-            capacity = compute_capacity_for_given_eigenfrequency(frequency1)
+def chopping_frequency_from_mieze_time(mieze_time_value):
+    """Invert `mieze_time` to get the chopping frequency needed for the given mieze time.
+
+    Parameters
+    ----------
+    mieze_time_value: float, ndarray
+
+    Returns
+    -------
+    out: float, ndarray
+    """
+    return mieze_time_value / (((mass_neutron/h_planck_constant) ** 2) * (wavelength ** 3) * length)
+
+
+def frequency1_from_chopping_frequency(chopping_frequency_value, prefactor=1.2):
+    """Invert `chopping_frequency` for the first frequency, with the second one fixed by the ratio `prefactor`.
+
+    Parameters
+    ----------
+    chopping_frequency_value: float, ndarray
+    prefactor: float, optional
+        Ratio between the second and the first frequency.
+        Defaults to 1.2.
+
+    Returns
+    -------
+    out: float, ndarray
+    """
+    return chopping_frequency_value / (2 * (prefactor - 1))
+
+
+def main(file_format='csv', both_coils=False):
+    """Generate the frequency table.
+
+    Parameters
+    ----------
+    file_format: str, optional
+        Either 'csv', or one of the columnar formats of `save_columns_to_file`.
+        Defaults to 'csv'.
+    both_coils: bool, optional
+        Flag indicating whether to tune both coils of each capacity box jointly, filling the coil2 columns.
+        Defaults to False, meaning only coil1 is tuned.
+    """
+    rows = list()
+
+    cbox1_coil1_transformer = 0
+    cbox1_coil2_c1 = 0
+    cbox1_coil2_c1c2serial = 0
+    cbox1_coil2_c2 = 0
+    cbox1_coil2_c3 = 0
+    cbox1_coil2_transformer = 0
+    cbox1_diplexer = 0
+    cbox1_power_divider = 0
+    cbox1_reg_amp = 1.6
+    cbox2_coil1_transformer = 0
+    cbox2_coil2_c1 = 0
+    cbox2_coil2_c1c2serial = 0
+    cbox2_coil2_c2 = 0
+    cbox2_coil2_c3 = 0
+    cbox2_coil2_transformer = 0
+    cbox2_diplexer = 0
+    cbox2_power_divider = 0
+    cbox2_reg_amp = 1.6
+    hsf1 = 0.4
+    hsf2 = 0.4
+    sf1 = 1.1
+    sf2 = 1.1
+
+    frequency1 = 30000
+
+    while frequency1 < 1000000:
+        print(frequency1)
+        capacity = compute_capacity_for_given_eigenfrequency(frequency1)
+        if both_coils:
+            (val_index_c1_1, val_index_c2_1, val_index_c3_1, connection_type_1), \
+                (cbox1_coil2_c1, cbox1_coil2_c2, cbox1_coil2_c3, cbox1_coil2_c1c2serial), \
+                remainder_capacity_1 = compute_pair_index(capacity)
+        else:
             numerical_values, message = compute_index(capacity)
             val_index_c1_1, val_index_c2_1, val_index_c3_1, connection_type_1, remainder_capacity_1 = numerical_values
 
-            print(f'{val_index_c1_1}, {val_index_c2_1}, {val_index_c3_1} {connection_type_1}')
+        print(f'{val_index_c1_1}, {val_index_c2_1}, {val_index_c3_1} {connection_type_1}')
 
-            frequency2 = compute_frequency2_from_frequency1(frequency1)
-            capacity = compute_capacity_for_given_eigenfrequency(frequency2)
+        frequency2 = compute_frequency2_from_frequency1(frequency1)
+        capacity = compute_capacity_for_given_eigenfrequency(frequency2)
+        if both_coils:
+            (val_index_c1_2, val_index_c2_2, val_index_c3_2, connection_type_2), \
+                (cbox2_coil2_c1, cbox2_coil2_c2, cbox2_coil2_c3, cbox2_coil2_c1c2serial), \
+                remainder_capacity_2 = compute_pair_index(capacity)
+        else:
             numerical_values, message = compute_index(capacity)
             val_index_c1_2, val_index_c2_2, val_index_c3_2, connection_type_2, remainder_capacity_2 = numerical_values
 
-            print(f'{val_index_c1_2}, {val_index_c2_2}, {val_index_c3_2} {connection_type_2}')
-
-            chopping_frequency_value = chopping_frequency(frequency1, frequency2)
-            timebin_value = timebin(chopping_frequency_value)
-            mieze_time_value = mieze_time(chopping_frequency_value)
-            hrf1 = transform_frequency(frequency1)
-            hrf2 = transform_frequency(frequency2)
-
-            print(f'echo time: {mieze_time_value}')
-
-            table_data_writer.writerow(
-                [round(mieze_time_value*100000000, 3),
-                 val_index_c1_1,
-                 connection_type_1,
-                 val_index_c2_1,
-                 val_index_c3_1,
-                 cbox1_coil1_transformer,
-                 cbox1_coil2_c1,
-                 cbox1_coil2_c1c2serial,
-                 cbox1_coil2_c2,
-                 cbox1_coil2_c3,
-                 cbox1_coil2_transformer,
-                 cbox1_diplexer,
-                 round(frequency1, n_digits),
-                 cbox1_power_divider,
-                 cbox1_reg_amp,
-                 val_index_c1_2,
-                 connection_type_2,
-                 val_index_c2_2,
-                 val_index_c3_2,
-                 cbox2_coil1_transformer,
-                 cbox2_coil2_c1,
-                 cbox2_coil2_c1c2serial,
-                 cbox2_coil2_c2,
-                 cbox2_coil2_c3,
-                 cbox2_coil2_transformer,
-                 cbox2_diplexer,
-                 round(frequency2, n_digits),
-                 cbox2_power_divider,
-                 cbox2_reg_amp,
-                 hrf1,
-                 hrf2,
-                 hsf1,
-                 hsf2,
-                 round(chopping_frequency_value, n_digits),
-                 round(timebin_value, n_digits),
-                 sf1,
-                 sf2])
-
-            # Assign the second frequency to the first one for the while loop
-            frequency1 = deepcopy(frequency2)
+        print(f'{val_index_c1_2}, {val_index_c2_2}, {val_index_c3_2} {connection_type_2}')
+
+        chopping_frequency_value = chopping_frequency(frequency1, frequency2)
+        timebin_value = timebin(chopping_frequency_value)
+        mieze_time_value = mieze_time(chopping_frequency_value)
+        hrf1 = transform_frequency(frequency1)
+        hrf2 = transform_frequency(frequency2)
+
+        print(f'echo time: {mieze_time_value}')
+
+        rows.append(
+            [round(mieze_time_value*echo_time_scale, 3),
+             val_index_c1_1,
+             connection_type_1,
+             val_index_c2_1,
+             val_index_c3_1,
+             cbox1_coil1_transformer,
+             cbox1_coil2_c1,
+             cbox1_coil2_c1c2serial,
+             cbox1_coil2_c2,
+             cbox1_coil2_c3,
+             cbox1_coil2_transformer,
+             cbox1_diplexer,
+             round(frequency1, n_digits),
+             cbox1_power_divider,
+             cbox1_reg_amp,
+             val_index_c1_2,
+             connection_type_2,
+             val_index_c2_2,
+             val_index_c3_2,
+             cbox2_coil1_transformer,
+             cbox2_coil2_c1,
+             cbox2_coil2_c1c2serial,
+             cbox2_coil2_c2,
+             cbox2_coil2_c3,
+             cbox2_coil2_transformer,
+             cbox2_diplexer,
+             round(frequency2, n_digits),
+             cbox2_power_divider,
+             cbox2_reg_amp,
+             hrf1,
+             hrf2,
+             hsf1,
+             hsf2,
+             round(chopping_frequency_value, n_digits),
+             round(timebin_value, n_digits),
+             sf1,
+             sf2])
+
+        # Assign the second frequency to the first one for the while loop
+        frequency1 = deepcopy(frequency2)
+
+    if file_format == 'csv':
+        with open('../../data/generated_table_data.csv', mode='w') as generated_table_data:
+            table_data_writer = csv.writer(generated_table_data, delimiter=',', quotechar='"',
+                                           quoting=csv.QUOTE_MINIMAL)
+            table_data_writer.writerow(frequency_table_header)
+            table_data_writer.writerows(rows)
+    else:
+        save_frequency_table_to_columnar_file(rows, '../../data/generated_table_data', file_format)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Hardware constraints on the usable capacity box combinations."""
+
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from scripts.analysis.compute_all_capacity_values import enumerate_combinations
+from scripts.analysis.find_best_capacity_index import find_nearest_capacities
+from scripts.capacity_boxes import capacity_box_1, capacity_box_2, capacity_box_3
+from scripts.compute_values.capacities import combine_box_capacities_exact, exact_capacity_sort_key, \
+    exact_capacity_to_float
+
+
+class HardwareConstraints:
+    """Class describing which combinations of the capacity boxes can be used on the hardware."""
+
+    def __init__(self, forbidden_bits=((), (), ()), absent_boxes=(), allowed_connection_types=(0, 1),
+                 max_active_relays=None):
+        """
+
+        Parameters
+        ----------
+        forbidden_bits: tuple, optional
+            For each of the three boxes, the positions of the capacitors that cannot be switched on, e.g. because of
+            broken relays. Position 0 is the smallest capacitor.
+            Defaults to no forbidden capacitors.
+        absent_boxes: tuple, optional
+            Numbers (1, 2 or 3) of the boxes that are not installed, i.e. whose index has to be 0.
+            Defaults to ().
+        allowed_connection_types: tuple, optional
+            Allowed connection types, 0 for parallel and 1 for serial.
+            Defaults to (0, 1).
+        max_active_relays: int, optional
+            Maximum number of capacitors switched on over all the boxes.
+            Defaults to None, meaning no limit.
+        """
+        forbidden_masks = [sum(1 << int(bit) for bit in bits) for bits in forbidden_bits]
+        for box in absent_boxes:
+            forbidden_masks[box - 1] = -1
+
+        self.forbidden_masks = tuple(forbidden_masks)
+        self.allowed_connection_types = tuple(sorted(set(allowed_connection_types)))
+        self.max_active_relays = max_active_relays
+
+    @property
+    def key(self):
+        """Return a hashable representation of the constraints."""
+        return self.forbidden_masks, self.allowed_connection_types, self.max_active_relays
+
+    def __eq__(self, other):
+        return isinstance(other, HardwareConstraints) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def compile_mask(self, connection_data):
+        """Compile the constraints into a boolean mask over the combinations.
+
+        Parameters
+        ----------
+        connection_data: ndarray
+            Array of shape (n, 4) containing the indexes for the capacity boxes and the connection type.
+
+        Returns
+        -------
+        mask: ndarray
+            Boolean array, True for the allowed combinations.
+        """
+        indexes = np.asarray(connection_data).astype(np.int64)
+
+        mask = np.isin(indexes[:, 3], self.allowed_connection_types)
+        for box, forbidden_mask in enumerate(self.forbidden_masks):
+            if forbidden_mask:
+                mask &= (indexes[:, box] & forbidden_mask) == 0
+
+        if self.max_active_relays is not None:
+            active_relays = np.zeros(len(indexes), dtype=np.int64)
+            for box in range(3):
+                index = indexes[:, box].copy()
+                while np.any(index):
+                    active_relays += index & 1
+                    index >>= 1
+            mask &= active_relays <= self.max_active_relays
+
+        return mask
+
+
+@lru_cache(maxsize=None)
+def sorted_combinations(boxes=(capacity_box_1, capacity_box_2, capacity_box_3)):
+    """Enumerate all the combinations of the boxes, without deduplication, and sort them by capacity.
+
+    Parameters
+    ----------
+    boxes: tuple, optional
+        The three CapacityBoxes instances.
+
+    Returns
+    -------
+    capacities: ndarray
+        Capacities of all the combinations, sorted in increasing order. Equal capacities are in the enumeration order.
+    connection_data: ndarray
+        Array of shape (len(capacities), 4) containing the indexes for the capacity boxes and the connection type.
+    """
+    combinations = enumerate_combinations(boxes)
+    c1, c2, c3, serial = combinations
+    numerator, denominator = combine_box_capacities_exact(boxes[0].index_to_picofarad_array(c1),
+                                                          boxes[1].index_to_picofarad_array(c2),
+                                                          boxes[2].index_to_picofarad_array(c3), serial)
+    key, _ = exact_capacity_sort_key(numerator, denominator)
+
+    order = np.lexsort((np.arange(len(key)), key))
+    return exact_capacity_to_float(numerator, denominator)[order], np.column_stack(combinations)[order]
+
+
+class ConstrainedCapacityTable:
+    """Class answering lookups on the combinations allowed by hardware constraints.
+
+    The constraints are applied to all the combinations of the boxes, so that a capacity stays available when the
+    combination kept for it in `data/capacities.csv` is forbidden but another one reaching it is allowed. The allowed
+    subset of each constraint set is compiled once and cached.
+    """
+
+    def __init__(self, capacities=None, connection_data=None, boxes=(capacity_box_1, capacity_box_2, capacity_box_3)):
+        """
+
+        Parameters
+        ----------
+        capacities: ndarray, optional
+            Capacities of the combinations sorted in increasing order, equal capacities included.
+        connection_data: ndarray, optional
+            Array of shape (len(capacities), 4) containing the indexes for the capacity boxes and the connection type.
+        boxes: tuple, optional
+            The three CapacityBoxes instances whose combinations are enumerated if `capacities` is not given.
+        """
+        if capacities is None:
+            capacities, connection_data = sorted_combinations(tuple(boxes))
+
+        self.capacities = capacities
+        self.connection_data = connection_data
+
+        self._lock = threading.Lock()
+        self._subsets = dict()
+
+    def subset(self, constraints=None):
+        """Return the allowed subset of the table, compiling it on first use.
+
+        For each distinct allowed capacity, the last allowed combination in the table is kept.
+
+        Parameters
+        ----------
+        constraints: HardwareConstraints, optional
+            Defaults to None, meaning all the combinations.
+
+        Returns
+        -------
+        capacities: ndarray
+            Distinct allowed capacities, sorted in increasing order.
+        connection_data: ndarray
+            Connection data of the allowed capacities.
+        """
+        subset = self._subsets.get(constraints)
+        if subset is None:
+            with self._lock:
+                subset = self._subsets.get(constraints)
+                if subset is None:
+                    if constraints is None:
+                        mask = np.ones(len(self.capacities), dtype=bool)
+                    else:
+                        mask = constraints.compile_mask(self.connection_data)
+                    capacities, connection_data = self.capacities[mask], self.connection_data[mask]
+
+                    is_last = np.append(capacities[1:] != capacities[:-1], True)
+                    subset = capacities[is_last], connection_data[is_last]
+                    self._subsets[constraints] = subset
+        return subset
+
+    def find_nearest(self, desired_capacities, constraints=None):
+        """Return the closest allowed capacities to the desired ones.
+
+        Parameters
+        ----------
+        desired_capacities: float, ndarray
+        constraints: HardwareConstraints, optional
+
+        Returns
+        -------
+        out: tuple
+            Best capacities, errors and connection data, see `find_nearest_capacities`.
+        """
+        capacities, connection_data = self.subset(constraints)
+        if len(capacities) == 0:
+            raise ValueError('No combination satisfies the constraints.')
+        return find_nearest_capacities(capacities, connection_data, np.atleast_1d(desired_capacities))
+
+    def find_top_k(self, desired_capacities, k=5, constraints=None):
+        """Return the k closest allowed capacities to each of the desired ones.
+
+        Parameters
+        ----------
+        desired_capacities: float, ndarray
+        k: int, optional
+            Number of returned combinations per desired capacity.
+            Defaults to 5.
+        constraints: HardwareConstraints, optional
+
+        Returns
+        -------
+        best_capacities: ndarray
+            Array of shape (n, k), ordered by increasing error.
+        errors: ndarray
+            Array of shape (n, k).
+        connection_data: ndarray
+            Array of shape (n, k, 4).
+        """
+        capacities, connection_data = self.subset(constraints)
+        k = min(k, len(capacities))
+        if k == 0:
+            raise ValueError('No combination satisfies the constraints.')
+
+        desired_capacities = np.atleast_1d(np.asarray(desired_capacities, dtype=float))
+
+        # The k closest values lie within k positions on each side of the insertion point
+        position = np.searchsorted(capacities, desired_capacities)
+        window = np.clip(position[:, np.newaxis] + np.arange(-k, k), 0, len(capacities) - 1)
+        errors = np.abs(capacities[window] - desired_capacities[:, np.newaxis])
+
+        # Clipping duplicates the edge positions, push them to the end
+        duplicated = np.zeros(window.shape, dtype=bool)
+        duplicated[:, 1:] = window[:, 1:] == window[:, :-1]
+        order = np.argsort(np.where(duplicated, np.inf, errors), axis=1, kind='stable')[:, :k]
+
+        best = np.take_along_axis(window, order, axis=1)
+        return capacities[best], np.take_along_axis(errors, order, axis=1), connection_data[best]
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Coverage and gap analysis of the achievable eigenfrequencies."""
+
+import numpy as np
+
+from scripts.analysis.compute_all_capacity_values import enumerate_combinations
+from scripts.capacity_boxes import capacity_box_1, capacity_box_2, capacity_box_3
+from scripts.compute_values.capacities import combine_box_capacities
+from scripts.compute_values.eigenfrequency_capacity import compute_eigen_frequency
+from scripts.parameters import computed_params
+
+
+def achievable_frequencies(params=computed_params, boxes=(capacity_box_1, capacity_box_2, capacity_box_3)):
+    """Compute the sorted eigenfrequencies of all the box combinations.
+
+    Parameters
+    ----------
+    params: tuple, optional
+        Parameters of the eigenfrequency equation.
+        Defaults to `computed_params`.
+    boxes: tuple, optional
+        The three CapacityBoxes instances.
+
+    Returns
+    -------
+    out: ndarray
+        Finite eigenfrequencies, sorted in increasing order.
+    """
+    c1, c2, c3, serial = enumerate_combinations(boxes)
+    capacities = combine_box_capacities(boxes[0].index_to_capacity_array(c1), boxes[1].index_to_capacity_array(c2),
+                                        boxes[2].index_to_capacity_array(c3), serial)
+    frequencies = compute_eigen_frequency(capacities, *params)
+    return np.sort(frequencies[np.isfinite(frequencies)])
+
+
+def best_frequency_error(frequencies, desired_frequencies):
+    """Compute the relative error of the closest achievable frequency to each desired one.
+
+    Parameters
+    ----------
+    frequencies: ndarray
+        Achievable frequencies, sorted in increasing order.
+    desired_frequencies: ndarray
+
+    Returns
+    -------
+    out: ndarray
+        Relative errors.
+    """
+    desired_frequencies = np.asarray(desired_frequencies, dtype=float)
+    upper = np.clip(np.searchsorted(frequencies, desired_frequencies), 1, len(frequencies) - 1)
+    error = np.minimum(np.abs(frequencies[upper] - desired_frequencies),
+                       np.abs(frequencies[upper - 1] - desired_frequencies))
+    return error / desired_frequencies
+
+
+def band_errors(frequencies, frequency_min=30000, frequency_max=1000000, n_bands=20, n_points=10000):
+    """Compute the worst case and the mean relative frequency error per logarithmic band.
+
+    The worst case is exact, as the largest error between two neighbouring achievable frequencies is reached at
+    their middle. The mean is sampled on `n_points` logarithmically spaced frequencies.
+
+    Parameters
+    ----------
+    frequencies: ndarray
+        Achievable frequencies, sorted in increasing order.
+    frequency_min: float, optional
+        Defaults to 30 kHz.
+    frequency_max: float, optional
+        Defaults to 1 MHz.
+    n_bands: int, optional
+        Defaults to 20.
+    n_points: int, optional
+        Defaults to 10000.
+
+    Returns
+    -------
+    band_edges: ndarray
+        Edges of the bands, of length n_bands + 1.
+    worst_error: ndarray
+        Maximum relative error in each band.
+    mean_error: ndarray
+        Mean relative error in each band.
+    """
+    band_edges = np.geomspace(frequency_min, frequency_max, n_bands + 1)
+
+    midpoints = (frequencies[1:] + frequencies[:-1]) / 2
+    candidates = np.concatenate((midpoints[(midpoints >= frequency_min) & (midpoints <= frequency_max)], band_edges))
+    band = np.clip(np.searchsorted(band_edges, candidates, side='right') - 1, 0, n_bands - 1)
+    worst_error = np.zeros(n_bands)
+    np.maximum.at(worst_error, band, best_frequency_error(frequencies, candidates))
+    # The edges belong to both neighbouring bands
+    edge_error = best_frequency_error(frequencies, band_edges)
+    worst_error = np.maximum(worst_error, np.maximum(edge_error[:-1], edge_error[1:]))
+
+    grid = np.geomspace(frequency_min, frequency_max, n_points)
+    band = np.clip(np.searchsorted(band_edges, grid, side='right') - 1, 0, n_bands - 1)
+    mean_error = np.bincount(band, weights=best_frequency_error(frequencies, grid), minlength=n_bands) / \
+        np.maximum(np.bincount(band, minlength=n_bands), 1)
+
+    return band_edges, worst_error, mean_error
+
+
+def find_gaps(frequencies, tolerance, frequency_min=30000, frequency_max=1000000):
+    """Find the frequency intervals where the closest achievable frequency has a relative error above tolerance.
+
+    A frequency f is covered by an achievable frequency f_i if |f - f_i| <= tolerance * f, i.e. if
+    f_i / (1 + tolerance) <= f <= f_i / (1 - tolerance).
+
+    Parameters
+    ----------
+    frequencies: ndarray
+        Achievable frequencies, sorted in increasing order.
+    tolerance: float
+        Relative tolerance.
+    frequency_min: float, optional
+        Defaults to 30 kHz.
+    frequency_max: float, optional
+        Defaults to 1 MHz.
+
+    Returns
+    -------
+    out: ndarray
+        Array of shape (n, 2) with the start and end of each uncovered interval.
+    """
+    covered_start = np.concatenate(([np.inf], frequencies / (1 + tolerance)))
+    covered_end = np.concatenate(([-np.inf], frequencies / (1 - tolerance)))
+    # Since the covered intervals are ordered, the gaps are between the end of one and the start of the next
+    gap_start = np.maximum(np.maximum.accumulate(covered_end), frequency_min)
+    gap_end = np.minimum(np.append(covered_start[1:], np.inf), frequency_max)
+
+    mask = gap_end > gap_start
+    return np.column_stack((gap_start[mask], gap_end[mask]))
+
+
+def total_gap_width(frequencies, tolerance, frequency_min=30000, frequency_max=1000000):
+    """Return the total width of the uncovered intervals on a logarithmic scale, see `find_gaps`."""
+    gaps = find_gaps(frequencies, tolerance, frequency_min, frequency_max)
+    return np.sum(np.log(gaps[:, 1] / gaps[:, 0]))
+
+
+def rank_additional_capacitors(candidate_values, tolerance, params=computed_params, frequency_min=30000,
+                               frequency_max=1000000, boxes=(capacity_box_1, capacity_box_2, capacity_box_3)):
+    """Rank which single capacitor added to which box shrinks the uncovered intervals the most.
+
+    Adding a capacitor to a box only adds the combinations where it is switched on, so only these are computed and
+    merged into the sorted achievable frequencies of the existing boxes.
+
+    Parameters
+    ----------
+    candidate_values: list
+        Capacity values [nF] of the candidate capacitors.
+    tolerance: float
+        Relative frequency tolerance.
+    params: tuple, optional
+        Parameters of the eigenfrequency equation.
+        Defaults to `computed_params`.
+    frequency_min: float, optional
+    frequency_max: float, optional
+    boxes: tuple, optional
+        The three CapacityBoxes instances.
+
+    Returns
+    -------
+    ranking: list
+        List of (box number, capacitor value, total gap width) tuples, ordered by increasing gap width.
+    """
+    frequencies = achievable_frequencies(params, boxes)
+    box_capacities = [box.index_to_capacity_array(np.arange(box.max_index)) for box in boxes]
+    c1, c2, c3, serial = enumerate_combinations(boxes)
+    indexes = (c1, c2, c3)
+
+    ranking = list()
+    for box_number in range(3):
+        for value in candidate_values:
+            capacities = [box_capacities[i][indexes[i]] for i in range(3)]
+            capacities[box_number] = capacities[box_number] + value
+
+            new_frequencies = compute_eigen_frequency(combine_box_capacities(*capacities, serial), *params)
+            new_frequencies = np.sort(new_frequencies[np.isfinite(new_frequencies)])
+            merged = np.insert(frequencies, np.searchsorted(frequencies, new_frequencies), new_frequencies)
+
+            ranking.append((box_number + 1, value, total_gap_width(merged, tolerance, frequency_min, frequency_max)))
+
+    return sorted(ranking, key=lambda item: item[2])
+
+
+def main():
+    frequencies = achievable_frequencies()
+    band_edges, worst_error, mean_error = band_errors(frequencies)
+    for i in range(len(worst_error)):
+        print(f'{band_edges[i]:.0f} - {band_edges[i + 1]:.0f} Hz: worst {worst_error[i]:.2e}, mean {mean_error[i]:.2e}')
+
+    gaps = find_gaps(frequencies, 1e-2)
+    print(f'{len(gaps)} uncovered intervals for 1% tolerance, the largest are:')
+    print(gaps[np.argsort(gaps[:, 0] - gaps[:, 1])[:5]])
+    print(rank_additional_capacitors([0.01, 0.02, 0.5, 5, 20], 1e-3)[:5])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Batch conversion from requested echo times to the settings of both coils."""
+
+import numpy as np
+
+from scripts.analysis.compute_frequency_table import chopping_frequency, chopping_frequency_from_mieze_time, \
+    compute_frequency2_from_frequency1, echo_time_scale, frequency1_from_chopping_frequency, mieze_time
+from scripts.analysis.find_best_capacity_index import find_best_capacity_values
+from scripts.compute_values.eigenfrequency_capacity import compute_capacity_for_given_eigenfrequency, \
+    compute_eigen_frequency
+from scripts.parameters import computed_params
+
+
+def solve_echo_times(echo_times, params=computed_params, prefactor=1.2, time_scale=echo_time_scale,
+                     data_file='data/capacities.csv'):
+    """Compute the capacity box settings of both coils for an array of requested echo times.
+
+    Parameters
+    ----------
+    echo_times: float, ndarray
+        Requested echo times, in the units of the echotime column of the frequency table.
+    params: tuple, optional
+        Parameters of the eigenfrequency equation.
+        Defaults to `computed_params`.
+    prefactor: float, optional
+        Ratio between the second and the first frequency.
+        Defaults to 1.2.
+    time_scale: float, optional
+        Factor between the mieze time and the given echo times.
+        Defaults to `echo_time_scale`.
+    data_file: str, optional
+        Capacities table used for the lookup.
+
+    Returns
+    -------
+    frequency1: ndarray
+        Ideal eigenfrequency of the first coil.
+    frequency2: ndarray
+        Ideal eigenfrequency of the second coil.
+    connection_data_1: ndarray
+        Array of shape (n, 4) with the box indexes and connection type of the first coil.
+    connection_data_2: ndarray
+        Array of shape (n, 4) with the box indexes and connection type of the second coil.
+    achieved_echo_times: ndarray
+        Echo times obtained with the chosen settings.
+    echo_time_errors: ndarray
+        Difference between the achieved and the requested echo times.
+    """
+    echo_times = np.atleast_1d(np.asarray(echo_times, dtype=float))
+
+    chopping_frequency_value = chopping_frequency_from_mieze_time(echo_times / time_scale)
+    frequency1 = frequency1_from_chopping_frequency(chopping_frequency_value, prefactor)
+    frequency2 = compute_frequency2_from_frequency1(frequency1, prefactor)
+
+    # Resolve both coils in a single lookup
+    capacities = compute_capacity_for_given_eigenfrequency(np.concatenate((frequency1, frequency2)), params)
+    best_capacities, _, connection_data = find_best_capacity_values(capacities, data_file)
+    achieved_frequency = compute_eigen_frequency(best_capacities, *params)
+
+    n = len(echo_times)
+    achieved_echo_times = mieze_time(chopping_frequency(achieved_frequency[:n], achieved_frequency[n:])) * time_scale
+
+    return frequency1, frequency2, connection_data[:n], connection_data[n:], achieved_echo_times, \
+        achieved_echo_times - echo_times
+
+
+def main():
+    echo_times = np.array([0.118, 0.5, 1, 2])
+    *_, achieved_echo_times, echo_time_errors = solve_echo_times(echo_times)
+    for requested, achieved, error in zip(echo_times, achieved_echo_times, echo_time_errors):
+        print(f'requested: {requested}, achieved: {achieved}, error: {error}')
+
+
+if __name__ == '__main__':
+    main()
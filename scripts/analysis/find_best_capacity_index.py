@@ -8,12 +8,17 @@
 
 """Compute the index corresponding to the closest capacity value the user desires."""
 
+from functools import lru_cache
 
-from scripts.capacity_boxes import capacity_box_1, capacity_box_2, capacity_box_3
+import numpy as np
+
+from scripts.analysis.compute_all_capacity_values import unique_combinations
+from scripts.capacity_boxes import CapacityBoxes, capacity_box_1, capacity_box_2, capacity_box_3
+from scripts.compute_values.capacities import exact_capacity_to_float
 from scripts.utils import read_capacities_data_from_file
 
 
-def find_best_capacity_value(desired_capacity, data_file='data/capacities.csv'):
+def find_best_capacity_value(desired_capacity, data_file='data/capacities.csv', capacity_table=None):
     """Return the closest capacity to the desired one from the possible capacity combinations.
 
     Parameters
@@ -21,6 +26,8 @@ def find_best_capacity_value(desired_capacity, data_file='data/capacities.csv'):
     desired_capacity: float
         The desired capacity value needed for the circuit.
     data_file: str
+    capacity_table: tuple, optional
+        Capacities table in the format of `read_capacities`, used instead of `data_file`.
 
     Returns
     -------
@@ -30,30 +37,142 @@ def find_best_capacity_value(desired_capacity, data_file='data/capacities.csv'):
     connection_data: tuple
         Tuple containing the indexes for the capacity boxes and the connection type (serial/parallel).
     """
-    try:
-        values = read_capacities_data_from_file(data_file)
-    except FileNotFoundError:
-        data_file = f'../../{data_file}'
-        values = read_capacities_data_from_file(data_file)
+    values = read_capacities(data_file) if capacity_table is None else capacity_table
 
     best_capacity = 0
     error = desired_capacity
     connection_data = None
 
-    for i in range(len(values[0])):
-        value = values[0][i]
-        new_error = abs(value - desired_capacity)
+    errors = np.abs(values[0] - desired_capacity)
+    best = np.argmin(errors)
 
-        if new_error < error:
-            best_capacity = value
-            error = new_error
+    # Same as keeping the first strictly smaller error, starting from the desired capacity itself
+    if errors[best] < error:
+        best_capacity = values[0][best]
+        error = errors[best]
 
-            connection_data = values[1][i], values[2][i], values[3][i], values[4][i]
+        connection_data = values[1][best], values[2][best], values[3][best], values[4][best]
 
     return best_capacity, error, connection_data
 
 
-def compute_index(capacity, from_data_table=True):
+@lru_cache(maxsize=None)
+def read_capacities(data_file='data/capacities.csv'):
+    """Read the capacities table on first use and keep it for the next lookups.
+
+    Parameters
+    ----------
+    data_file: str
+        Relative to the root of the repository or to `scripts/analysis`.
+
+    Returns
+    -------
+    out: tuple
+        See `read_capacities_data_from_file`.
+    """
+    try:
+        return read_capacities_data_from_file(data_file)
+    except FileNotFoundError:
+        return read_capacities_data_from_file(f'../../{data_file}')
+
+
+@lru_cache(maxsize=8)
+def enumerate_capacities(box_lists):
+    """Build the capacities table of the given capacity box lists in memory.
+
+    Parameters
+    ----------
+    box_lists: tuple
+        Tuple of the three tuples of available capacities [nF] of the boxes.
+
+    Returns
+    -------
+    out: tuple
+        Capacities and connection data in the format of `read_capacities`, in the same row order as
+        `compute_all_possible_capacities`.
+    """
+    boxes = tuple(CapacityBoxes(capacity_list=tuple(box_list)) for box_list in box_lists)
+    numerator, denominator, connection_data = unique_combinations(boxes)
+    c1, c2, c3, connection_type = connection_data.T
+    return exact_capacity_to_float(numerator, denominator), c1.astype(float), c2.astype(float), c3.astype(float), \
+        connection_type
+
+
+@lru_cache(maxsize=None)
+def read_sorted_capacities(data_file='data/capacities.csv'):
+    """Read the capacities table and sort it by capacity for vectorized lookups.
+
+    Parameters
+    ----------
+    data_file: str
+
+    Returns
+    -------
+    capacities: ndarray
+        Capacities sorted in increasing order.
+    connection_data: ndarray
+        Array of shape (n, 4) containing the indexes for the capacity boxes and the connection type.
+    """
+    values = read_capacities(data_file)
+
+    order = np.argsort(values[0], kind='stable')
+    connection_data = np.column_stack(values[1:])[order]
+    return values[0][order], connection_data
+
+
+def find_best_capacity_values(desired_capacities, data_file='data/capacities.csv'):
+    """Vectorized version of `find_best_capacity_value` for an array of desired capacities.
+
+    Parameters
+    ----------
+    desired_capacities: ndarray
+        The desired capacity values.
+    data_file: str
+
+    Returns
+    -------
+    best_capacities: ndarray
+    errors: ndarray
+        The absolute differences between the outputs and the desired capacities.
+    connection_data: ndarray
+        Array of shape (len(desired_capacities), 4) containing the indexes for the capacity boxes and the connection
+        type (serial/parallel).
+    """
+    capacities, connection_data = read_sorted_capacities(data_file)
+    return find_nearest_capacities(capacities, connection_data, desired_capacities)
+
+
+def find_nearest_capacities(capacities, connection_data, desired_capacities):
+    """Find the closest capacities in a sorted capacities table.
+
+    Parameters
+    ----------
+    capacities: ndarray
+        Capacities sorted in increasing order.
+    connection_data: ndarray
+        Array of shape (len(capacities), 4) containing the indexes for the capacity boxes and the connection type.
+    desired_capacities: ndarray
+        The desired capacity values.
+
+    Returns
+    -------
+    best_capacities: ndarray
+    errors: ndarray
+        The absolute differences between the outputs and the desired capacities.
+    connection_data: ndarray
+        Array of shape (len(desired_capacities), 4) with the connection data of the closest capacities.
+    """
+    desired_capacities = np.asarray(desired_capacities, dtype=float)
+
+    upper = np.clip(np.searchsorted(capacities, desired_capacities), 1, len(capacities) - 1)
+    lower = upper - 1
+    best = np.where(np.abs(capacities[lower] - desired_capacities) <= np.abs(capacities[upper] - desired_capacities),
+                    lower, upper)
+
+    return capacities[best], np.abs(capacities[best] - desired_capacities), connection_data[best]
+
+
+def compute_index(capacity, from_data_table=True, capacity_table=None):
     """Compute the index from the given capacity.
 
     Strongly recommended: use the data table.
@@ -66,6 +185,8 @@ def compute_index(capacity, from_data_table=True):
     from_data_table: bool, optional
         Flag indicating whether to use the data table or to compute from scratch.
         Defaults to True.
+    capacity_table: tuple, optional
+        Capacities table used instead of the data file, see `find_best_capacity_value`.
 
     Returns
     -------
@@ -84,7 +205,8 @@ def compute_index(capacity, from_data_table=True):
             The difference between the desired capacity and the output capacity.
     """
     if from_data_table:
-        best_capacity, remainder_capacity, connection_data = find_best_capacity_value(capacity)
+        best_capacity, remainder_capacity, connection_data = find_best_capacity_value(capacity,
+                                                                                      capacity_table=capacity_table)
         val_index_c1, val_index_c2, val_index_c3, connection_type = connection_data
     else:
 
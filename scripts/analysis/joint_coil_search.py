@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Joint search of the settings of both coils of a capacity box."""
+
+import numpy as np
+
+from scripts.analysis.find_best_capacity_index import read_sorted_capacities
+
+
+def find_best_capacity_pair(desired_capacity, capacities, connection_data):
+    """Find the pair of combinations whose capacities add up closest to the desired capacity.
+
+    When both coils of a capacity box are used, their capacitor networks are connected in parallel, so their
+    capacities add up. Instead of the squared product of all the combinations, only the combinations up to half the
+    desired capacity are taken for the smaller one, and the best partner of each of them is found by binary search in
+    the sorted capacities. Pairs of two capacities above half the desired one are all worse than twice the smallest of
+    them, so only that one has to be added to the candidates.
+
+    Parameters
+    ----------
+    desired_capacity: float
+    capacities: ndarray
+        Capacities sorted in increasing order.
+    connection_data: ndarray
+        Array of shape (len(capacities), 4) containing the indexes for the capacity boxes and the connection type.
+
+    Returns
+    -------
+    best_capacity: float
+        Sum of the capacities of both coils.
+    error: float
+        The absolute difference between the output and the desired capacity.
+    connection_data_1: ndarray
+        Connection data of the first coil, the larger capacity.
+    connection_data_2: ndarray
+        Connection data of the second coil, the smaller capacity.
+    """
+    n_smaller = min(np.searchsorted(capacities, desired_capacity / 2, side='right') + 1, len(capacities))
+    smaller = capacities[:n_smaller]
+
+    upper = np.clip(np.searchsorted(capacities, desired_capacity - smaller), 1, len(capacities) - 1)
+    lower = upper - 1
+    upper_error = np.abs(smaller + capacities[upper] - desired_capacity)
+    lower_error = np.abs(smaller + capacities[lower] - desired_capacity)
+    partner = np.where(lower_error <= upper_error, lower, upper)
+    errors = np.minimum(lower_error, upper_error)
+
+    best = int(np.argmin(errors))
+    larger = int(partner[best])
+    if capacities[larger] < capacities[best]:
+        best, larger = larger, best
+
+    return capacities[best] + capacities[larger], errors[best], connection_data[larger], connection_data[best]
+
+
+def compute_pair_index(capacity, data_file='data/capacities.csv'):
+    """Compute the indexes of both coils of a capacity box from the given capacity.
+
+    Parameters
+    ----------
+    capacity: float
+        Capacity value to be converted to indexes.
+    data_file: str, optional
+        Capacities table used for the search.
+
+    Returns
+    -------
+    numerical_output: tuple
+        Tuple of values containing:
+
+        indexes_coil_1: tuple
+            The (c1, c2, c3, connection type) indexes of the first coil.
+        indexes_coil_2: tuple
+            The (c1, c2, c3, connection type) indexes of the second coil.
+        remainder_capacity: float
+            The difference between the desired capacity and the output capacity.
+    """
+    capacities, connection_data = read_sorted_capacities(data_file)
+    best_capacity, remainder_capacity, connection_data_1, connection_data_2 = find_best_capacity_pair(
+        capacity, capacities, connection_data)
+
+    indexes_coil_1 = (*connection_data_1[:3], int(connection_data_1[3]))
+    indexes_coil_2 = (*connection_data_2[:3], int(connection_data_2[3]))
+
+    return indexes_coil_1, indexes_coil_2, remainder_capacity
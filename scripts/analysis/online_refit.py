@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Incremental refit of the eigenfrequency equation as new calibration points arrive."""
+
+import csv
+import os
+
+import numpy as np
+
+from scripts.analysis.find_best_capacity_index import find_nearest_capacities, read_sorted_capacities
+from scripts.analysis.optimize import fit_eigen_frequency
+from scripts.compute_values.capacities import compute_capacity_values
+from scripts.compute_values.eigenfrequency_capacity import compute_eigen_frequency
+from scripts.parameters import computed_params
+from scripts.utils import read_data_from_file
+
+
+class OnlineCalibration:
+    """Class keeping an append-only store of calibration points and the parameters fitted to them.
+
+    Every new point triggers a refit warm-started from the last fitted parameters. The active parameters, and the
+    frequency grid derived from them which the lookups search, are only replaced when the predicted frequencies change
+    by more than the relative `threshold`.
+    """
+
+    def __init__(self, params=computed_params, threshold=1e-3, data_file=None, store_file=None,
+                 capacities_file='data/capacities.csv'):
+        """
+
+        Parameters
+        ----------
+        params: tuple, optional
+            Initial parameters of the eigenfrequency equation.
+            Defaults to `computed_params`.
+        threshold: float, optional
+            Maximum relative change of the predicted frequencies over the measured points before the active
+            parameters are updated.
+            Defaults to 1e-3.
+        data_file: str, optional
+            File with the already measured points, in the format of 'data/data.csv'.
+            Defaults to None.
+        store_file: str, optional
+            CSV file where the new points are appended to. If it exists already, its points are loaded as well.
+            Defaults to None, meaning the points are only kept in memory.
+        capacities_file: str, optional
+            Capacities table used for the lookups.
+        """
+        self.params = np.asarray(params, dtype=float)
+        self.fitted_params = self.params.copy()
+        self.threshold = threshold
+        self.store_file = store_file
+
+        self.frequency = np.empty(0)
+        self.capacity_1 = np.empty(0)
+        self.capacity_2 = np.empty(0)
+        self.connection_type = np.empty(0, dtype=int)
+        self.capacity_values = np.empty(0)
+
+        for file_name in (data_file, store_file):
+            if file_name is not None and os.path.isfile(file_name):
+                self._append(*read_data_from_file(file_name))
+
+        self.capacities, self.connection_data = read_sorted_capacities(capacities_file)
+        self.table_frequency = None
+        self._frequency_grid = None
+        self._update_derived()
+
+    def _append(self, frequency, capacity_1, capacity_2, connection_type):
+        """Append points to the in memory store."""
+        frequency, capacity_1, capacity_2, connection_type = (
+            np.atleast_1d(values) for values in (frequency, capacity_1, capacity_2, connection_type))
+
+        self.frequency = np.concatenate((self.frequency, frequency))
+        self.capacity_1 = np.concatenate((self.capacity_1, capacity_1))
+        self.capacity_2 = np.concatenate((self.capacity_2, capacity_2))
+        self.connection_type = np.concatenate((self.connection_type, connection_type.astype(int)))
+        self.capacity_values = np.concatenate(
+            (self.capacity_values, compute_capacity_values(capacity_1, capacity_2, connection_type)))
+
+    def _persist(self, frequency, capacity_1, capacity_2, connection_type):
+        """Append points to the store file."""
+        new_file = not os.path.isfile(self.store_file)
+        with open(self.store_file, 'a') as file:
+            csv_writer = csv.writer(file, delimiter=',')
+            if new_file:
+                csv_writer.writerow(['frequency', 'c1_box_index', 'c2_box_index', 'connection_type'])
+            csv_writer.writerows(zip(frequency, capacity_1, capacity_2, connection_type))
+
+    def _update_derived(self):
+        """Recompute the frequencies of the capacities table for the active parameters and sort them for lookups."""
+        with np.errstate(invalid='ignore'):
+            table_frequency = compute_eigen_frequency(self.capacities, *self.params)
+
+        # Capacities out of the domain of the equation have no frequency and are left out of the grid
+        rows = np.flatnonzero(np.isfinite(table_frequency))
+        rows = rows[np.argsort(table_frequency[rows], kind='stable')]
+
+        self.table_frequency = table_frequency
+        self._frequency_grid = table_frequency[rows], rows
+
+    def add_points(self, frequency, capacity_1, capacity_2, connection_type):
+        """Add new measured points and refit.
+
+        Parameters
+        ----------
+        frequency: float, ndarray
+            Measured frequencies.
+        capacity_1: int, ndarray
+            Indexes of the first capacity box.
+        capacity_2: int, ndarray
+            Indexes of the second capacity box.
+        connection_type: int, ndarray
+            Flags indicating whether the first two boxes are connected in series or in parallel.
+
+        Returns
+        -------
+        updated: bool
+            Flag indicating whether the active parameters were updated.
+        """
+        values = [np.atleast_1d(value) for value in (frequency, capacity_1, capacity_2, connection_type)]
+        self._append(*values)
+        if self.store_file is not None:
+            self._persist(*values)
+
+        return self.refit()
+
+    def refit(self):
+        """Refit the parameters warm-started from the last fitted ones.
+
+        Returns
+        -------
+        updated: bool
+            Flag indicating whether the active parameters were updated.
+        """
+        if len(self.frequency) < len(self.params):
+            return False
+
+        try:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self.fitted_params = fit_eigen_frequency(self.capacity_values, self.frequency, p0=self.fitted_params)
+        except RuntimeError:
+            return False
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            old_frequency = compute_eigen_frequency(self.capacity_values, *self.params)
+            new_frequency = compute_eigen_frequency(self.capacity_values, *self.fitted_params)
+        change = np.nanmax(np.abs(new_frequency - old_frequency) / np.abs(old_frequency))
+
+        if change > self.threshold:
+            self.params = self.fitted_params.copy()
+            self._update_derived()
+            return True
+        return False
+
+    def lookup(self, eigenfrequency):
+        """Find the box settings whose predicted frequencies are closest to the given ones.
+
+        The search runs on the frequency grid of the active parameters, so no capacity is computed per call.
+
+        Parameters
+        ----------
+        eigenfrequency: float, ndarray
+
+        Returns
+        -------
+        best_capacities: ndarray
+        errors: ndarray
+            The absolute differences between the predicted and the given frequencies.
+        connection_data: ndarray
+            Array of shape (len(eigenfrequency), 4) with the connection data of the best capacities.
+        """
+        frequencies, rows = self._frequency_grid
+        _, errors, best_rows = find_nearest_capacities(frequencies, rows, np.atleast_1d(eigenfrequency))
+        return self.capacities[best_rows], errors, self.connection_data[best_rows]
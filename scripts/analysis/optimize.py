@@ -8,17 +8,16 @@
 
 """Empirical optimization of the relation between the eigenfrequency and the capacity.."""
 
-import matplotlib.pyplot as plt
 import numpy as np
-from scipy import optimize
 
 from scripts.compute_values.capacities import compute_capacity_values
 from scripts.compute_values.eigenfrequency_capacity import compute_eigen_frequency, \
     compute_capacity_for_given_eigenfrequency
+from scripts.parameters import inductance
 from scripts.utils import read_data_from_file
 
 
-def plot_main(capacity_values, theoretical_frequency, measured_frequency, optimized_values):
+def plot_main(capacity_values, theoretical_frequency, measured_frequency, optimized_values, file_name=None):
     """Plot the frequency values vs the capacities.
 
     Parameters
@@ -31,7 +30,22 @@ def plot_main(capacity_values, theoretical_frequency, measured_frequency, optimi
         Measured frequency values.
     optimized_values: ndarray
         Frequency values computed using the optimized eigenfrequency equation.
+    file_name: str, optional
+        If given, the plot is rendered headless to this file instead of being shown.
+        Defaults to None.
     """
+    if file_name is not None:
+        from scripts.analysis.plot_diagnostics import render_figure
+
+        render_figure({'series': [(capacity_values, theoretical_frequency, 'o', 'Theoretical frequency values'),
+                                  (capacity_values, measured_frequency, 'v', 'Measured frequency values'),
+                                  (capacity_values, optimized_values, '*', 'Optimized frequency values')],
+                       'xlabel': 'Capacity [mF]', 'ylabel': 'Frequency [au]', 'xscale': 'log', 'yscale': 'log'},
+                      file_name)
+        return
+
+    import matplotlib.pyplot as plt
+
     plt.plot(capacity_values, theoretical_frequency, 'o')
     plt.plot(capacity_values, measured_frequency, 'v')
     plt.plot(capacity_values, optimized_values, '*')
@@ -48,22 +62,84 @@ def plot_main(capacity_values, theoretical_frequency, measured_frequency, optimi
     plt.show()
 
 
-def find_optimized_equation():
-    """Find the parameters for the eigenfrequency equation."""
+def fit_eigen_frequency(capacity_values, measured_frequency, p0=(1, 1/2, 0, 0), inductance_value=inductance):
+    """Fit the parameters of the eigenfrequency equation to the measured values.
+
+    Parameters
+    ----------
+    capacity_values: ndarray
+    measured_frequency: ndarray
+    p0: tuple, optional
+        Initial guess of the parameters.
+        Defaults to (1, 1/2, 0, 0).
+    inductance_value: float, ndarray, optional
+        Inductance of the circuit, or the measured inductance of each point.
+        Defaults to `inductance`.
+
+    Returns
+    -------
+    params: ndarray
+        Optimized parameters (a, n, b, d).
+    """
+    from scipy import optimize
+
+    params, params_covariance = optimize.curve_fit(
+        lambda capacity, a, n, b, d: compute_eigen_frequency(capacity, a, n, b, d, inductance_value),
+        capacity_values, measured_frequency, p0=list(p0))
+    return params
+
+
+def compute_frequency_residuals(capacity_values, measured_frequency, params, inductance_value=inductance):
+    """Compute the residuals of the eigenfrequency equation over the whole measurement set.
+
+    Parameters
+    ----------
+    capacity_values: ndarray
+    measured_frequency: ndarray
+    params: tuple
+        Parameters of the eigenfrequency equation.
+    inductance_value: float, ndarray, optional
+        Inductance of the circuit, or the measured inductance of each point.
+        Defaults to `inductance`.
+
+    Returns
+    -------
+    residuals: ndarray
+        Measured minus computed frequencies.
+    relative_residuals: ndarray
+        Residuals relative to the measured frequencies.
+    """
+    residuals = measured_frequency - compute_eigen_frequency(capacity_values, *params,
+                                                             inductance_value=inductance_value)
+    return residuals, residuals / measured_frequency
+
+
+def find_optimized_equation(measured_inductance=False):
+    """Find the parameters for the eigenfrequency equation.
+
+    Parameters
+    ----------
+    measured_inductance: bool, optional
+        Flag indicating whether to use the measured inductance of each point, `inductance` being used for the points
+        without one.
+        Defaults to False.
+    """
 
     # Read data from file
-    measured_frequency, capacity_1, capacity_2, connection_type = read_data_from_file('../../data/data.csv')
+    measured_frequency, capacity_1, capacity_2, connection_type, inductance_values = read_data_from_file(
+        '../../data/data.csv', read_inductance=True, default_inductance=inductance)
+    if not measured_inductance:
+        inductance_values = inductance
 
     # Compute capacity values
     capacity_values = compute_capacity_values(capacity_1, capacity_2, connection_type)
 
     # Compute theoretical frequency
-    theoretical_frequency = compute_eigen_frequency(np.asarray(capacity_values))
+    theoretical_frequency = compute_eigen_frequency(np.asarray(capacity_values), inductance_value=inductance_values)
 
     # Optimize the theoretical equation
-    params, params_covariance = optimize.curve_fit(compute_eigen_frequency, capacity_values, measured_frequency,
-                                                   p0=[1, 1/2, 0, 0])
-    optimized_values = compute_eigen_frequency(capacity_values, *params)
+    params = fit_eigen_frequency(capacity_values, measured_frequency, inductance_value=inductance_values)
+    optimized_values = compute_eigen_frequency(capacity_values, *params, inductance_value=inductance_values)
 
     # Plot the result
     plot_main(capacity_values, theoretical_frequency, measured_frequency, optimized_values)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Capacity combinations table including the parasitic capacity of the cables."""
+
+import numpy as np
+
+from scripts.analysis.find_best_capacity_index import find_nearest_capacities, read_sorted_capacities
+from scripts.compute_values.capacities import add_parasitic_capacity, compute_capacity_values, \
+    estimate_parasitic_capacity
+from scripts.compute_values.eigenfrequency_capacity import compute_capacity_for_given_eigenfrequency
+from scripts.parameters import inductance
+from scripts.utils import read_data_from_file
+
+
+class ParasiticCapacityTable:
+    """Class holding the effective capacity of every combination, including the parasitic capacity of the cables.
+
+    For a non negative parasitic capacity, the effective capacity increases with the capacity of the boxes for both
+    connection types, so only the effective capacity column is recomputed when the parasitic capacity changes. The
+    order used by the lookups is still checked and rebuilt if the column is not sorted.
+    """
+
+    def __init__(self, parasitic_capacity=0, connection_type='serial', capacities=None, connection_data=None,
+                 data_file='data/capacities.csv'):
+        """
+
+        Parameters
+        ----------
+        parasitic_capacity: float, optional
+            Defaults to 0.
+        connection_type: str, optional
+            Either 'serial' or 'parallel', see `parasitic_capacity_calculation`.
+            Defaults to 'serial'.
+        capacities: ndarray, optional
+            Capacities of the boxes sorted in increasing order.
+        connection_data: ndarray, optional
+            Array of shape (len(capacities), 4) containing the indexes for the capacity boxes and the connection type.
+        data_file: str, optional
+            Capacities table read if `capacities` is not given.
+        """
+        if capacities is None:
+            capacities, connection_data = read_sorted_capacities(data_file)
+
+        self.capacities = capacities
+        self.connection_data = connection_data
+
+        self.parasitic_capacity = None
+        self.connection_type = None
+        self.effective_capacities = None
+        self._sorted_table = None
+        self.set_parasitic_capacity(parasitic_capacity, connection_type)
+
+    def set_parasitic_capacity(self, parasitic_capacity, connection_type=None):
+        """Set the parasitic capacity and recompute the effective capacities if it changed.
+
+        Parameters
+        ----------
+        parasitic_capacity: float
+            Non negative parasitic capacity.
+        connection_type: str, optional
+            Defaults to None, meaning the current connection type.
+
+        Raises
+        ------
+        ValueError
+            If the parasitic capacity is negative.
+        """
+        if connection_type is None:
+            connection_type = self.connection_type
+
+        if parasitic_capacity == self.parasitic_capacity and connection_type == self.connection_type:
+            return
+
+        effective_capacities = add_parasitic_capacity(self.capacities, parasitic_capacity, connection_type)
+
+        self.parasitic_capacity = parasitic_capacity
+        self.connection_type = connection_type
+        self.effective_capacities = effective_capacities
+
+        if np.all(np.diff(effective_capacities) >= 0):
+            self._sorted_table = effective_capacities, self.connection_data
+        else:
+            order = np.argsort(effective_capacities, kind='stable')
+            self._sorted_table = effective_capacities[order], self.connection_data[order]
+
+    def estimate_parasitic_capacity(self, data_file='data/data.csv', connection_type=None, measured_inductance=False):
+        """Estimate the parasitic capacity from the measured points and use it.
+
+        Parameters
+        ----------
+        data_file: str, optional
+            File containing the measured frequencies.
+        connection_type: str, optional
+            Defaults to None, meaning the current connection type.
+        measured_inductance: bool, optional
+            Flag indicating whether to use the measured inductance of each point, `inductance` being used for the
+            points without one.
+            Defaults to False.
+
+        Returns
+        -------
+        parasitic_capacity: float
+
+        Raises
+        ------
+        ValueError
+            If the estimate is not physical for the connection type, the table being left unchanged.
+        """
+        if connection_type is None:
+            connection_type = self.connection_type
+
+        measured_frequency, capacity_1, capacity_2, connection, inductance_values = read_data_from_file(
+            data_file, read_inductance=True, default_inductance=inductance)
+        if not measured_inductance:
+            inductance_values = inductance
+        capacity_values = compute_capacity_values(capacity_1, capacity_2, connection)
+
+        parasitic_capacity = estimate_parasitic_capacity(capacity_values, measured_frequency, connection_type,
+                                                         inductance_values)
+        self.set_parasitic_capacity(parasitic_capacity, connection_type)
+        return parasitic_capacity
+
+    def find_best_capacity_values(self, desired_capacities):
+        """Return the combinations whose effective capacity is closest to the desired ones.
+
+        Parameters
+        ----------
+        desired_capacities: float, ndarray
+            Desired effective capacities of the circuit.
+
+        Returns
+        -------
+        out: tuple
+            Best effective capacities, errors and connection data, see `find_nearest_capacities`.
+        """
+        effective_capacities, connection_data = self._sorted_table
+        return find_nearest_capacities(effective_capacities, connection_data, np.atleast_1d(desired_capacities))
+
+    def lookup(self, eigenfrequency, params=(1, 1/2, 0, 0), inductance_value=inductance):
+        """Find the box settings for the given eigenfrequencies.
+
+        Parameters
+        ----------
+        eigenfrequency: float, ndarray
+        params: tuple, optional
+            Parameters of the eigenfrequency equation. As the cable capacity is accounted for explicitly here, this
+            defaults to the ideal LC circuit, (1, 1/2, 0, 0).
+        inductance_value: float, ndarray, optional
+            Inductance of the coil to be tuned, broadcast against `eigenfrequency`.
+            Defaults to `inductance`.
+
+        Returns
+        -------
+        out: tuple
+            Best effective capacities, errors and connection data, see `find_nearest_capacities`.
+        """
+        return self.find_best_capacity_values(
+            compute_capacity_for_given_eigenfrequency(np.asarray(eigenfrequency, dtype=float), params,
+                                                      np.asarray(inductance_value, dtype=float)))
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Headless rendering of the standard diagnostic plots."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from scripts.analysis.find_best_capacity_index import read_sorted_capacities
+from scripts.compute_values.capacities import compute_capacity_values, parasitic_capacity_calculation
+from scripts.compute_values.eigenfrequency_capacity import compute_eigen_frequency
+from scripts.parameters import computed_params
+from scripts.utils import read_data_from_file
+
+
+def bin_values(x, y, n_bins=500, log=True):
+    """Downsample the (x, y) values by binning them along x.
+
+    Parameters
+    ----------
+    x: ndarray
+    y: ndarray
+    n_bins: int, optional
+        Number of bins.
+        Defaults to 500.
+    log: bool, optional
+        Flag indicating whether the bins are logarithmically spaced. Non positive x values are then dropped.
+        Defaults to True.
+
+    Returns
+    -------
+    x_mean: ndarray
+        Mean x value of each non empty bin.
+    y_mean: ndarray
+        Mean y value of each non empty bin.
+    y_min: ndarray
+        Minimum y value of each non empty bin.
+    y_max: ndarray
+        Maximum y value of each non empty bin.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    mask = np.isfinite(x) & np.isfinite(y)
+    if log:
+        mask &= x > 0
+    x, y = x[mask], y[mask]
+
+    if len(x) <= n_bins:
+        return x, y, y, y
+
+    if log:
+        edges = np.geomspace(x.min(), x.max(), n_bins + 1)
+    else:
+        edges = np.linspace(x.min(), x.max(), n_bins + 1)
+    index = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, n_bins - 1)
+
+    counts = np.bincount(index, minlength=n_bins)
+    y_min = np.full(n_bins, np.inf)
+    y_max = np.full(n_bins, -np.inf)
+    np.minimum.at(y_min, index, y)
+    np.maximum.at(y_max, index, y)
+
+    filled = counts > 0
+    x_mean = np.bincount(index, weights=x, minlength=n_bins)[filled] / counts[filled]
+    y_mean = np.bincount(index, weights=y, minlength=n_bins)[filled] / counts[filled]
+
+    return x_mean, y_mean, y_min[filled], y_max[filled]
+
+
+def render_figure(figure_data, file_name):
+    """Render one figure to file on the non interactive Agg backend.
+
+    Parameters
+    ----------
+    figure_data: dict
+        Dictionary with the keys 'series', a list of (x, y, marker, label) tuples, and optionally 'band', a tuple
+        (x, y_min, y_max) drawn as a shaded area, 'xlabel', 'ylabel', 'xscale', 'yscale' and 'title'.
+    file_name: str
+        Name of the image file.
+
+    Returns
+    -------
+    file_name: str
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(8, 6))
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    if 'band' in figure_data:
+        ax.fill_between(*figure_data['band'], alpha=0.3)
+
+    for x, y, marker, label in figure_data['series']:
+        ax.plot(x, y, marker, label=label)
+
+    ax.set_xlabel(figure_data.get('xlabel', ''))
+    ax.set_ylabel(figure_data.get('ylabel', ''))
+    ax.set_xscale(figure_data.get('xscale', 'linear'))
+    ax.set_yscale(figure_data.get('yscale', 'linear'))
+    ax.set_title(figure_data.get('title', ''))
+
+    if any(label for *_, label in figure_data['series']):
+        ax.legend(loc='best')
+
+    figure.savefig(file_name)
+    return file_name
+
+
+def compute_diagnostic_figures(data_file='data/data.csv', capacities_file='data/capacities.csv',
+                               params=computed_params, n_bins=500):
+    """Compute the data of all the standard diagnostic plots.
+
+    Parameters
+    ----------
+    data_file: str, optional
+        File containing the measured frequencies.
+    capacities_file: str, optional
+        File containing all the possible capacities.
+    params: tuple, optional
+        Parameters of the eigenfrequency equation.
+        Defaults to `computed_params`.
+    n_bins: int, optional
+        Number of bins used to downsample the capacities table.
+        Defaults to 500.
+
+    Returns
+    -------
+    figures: dict
+        Dictionary mapping the figure names to the figure data accepted by `render_figure`.
+    """
+    measured_frequency, capacity_1, capacity_2, connection_type = read_data_from_file(data_file)
+    capacity_values = compute_capacity_values(capacity_1, capacity_2, connection_type)
+    theoretical_frequency = compute_eigen_frequency(capacity_values)
+    optimized_frequency = compute_eigen_frequency(capacity_values, *params)
+
+    capacities, _ = read_sorted_capacities(capacities_file)
+    x_mean, y_mean, y_min, y_max = bin_values(capacities, compute_eigen_frequency(capacities, *params), n_bins)
+
+    figures = dict()
+    figures['capacity_vs_eigenfrequency'] = {
+        'series': [(x_mean, y_mean, '-', 'Binned mean')],
+        'band': (x_mean, y_min, y_max),
+        'xlabel': 'Capacity [F]', 'ylabel': 'Eigenfrequency [Hz]', 'xscale': 'log', 'yscale': 'log'}
+    figures['theoretical_vs_effective_frequency'] = {
+        'series': [(measured_frequency, theoretical_frequency, '*', None)],
+        'xlabel': 'Measured frequency [Hz]', 'ylabel': 'Theoretical frequency [Hz]'}
+    figures['optimized_eigenfrequency'] = {
+        'series': [(capacity_values, theoretical_frequency, 'o', 'Theoretical frequency values'),
+                   (capacity_values, measured_frequency, 'v', 'Measured frequency values'),
+                   (capacity_values, optimized_frequency, '*', 'Optimized frequency values')],
+        'xlabel': 'Capacity [F]', 'ylabel': 'Frequency [Hz]', 'xscale': 'log', 'yscale': 'log'}
+
+    for connection in ('serial', 'parallel'):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            parasitic_capacity = parasitic_capacity_calculation(capacity_values, measured_frequency, connection)
+        figures[f'parasatic_capacity_{connection}'] = {
+            'series': [(measured_frequency, parasitic_capacity, '*', None)],
+            'xlabel': 'Measured frequency [Hz]', 'ylabel': 'Parasitic capacity [F]'}
+
+    return figures
+
+
+def render_diagnostics(output_directory='results', data_file='data/data.csv', capacities_file='data/capacities.csv',
+                       params=computed_params, n_bins=500, n_workers=None):
+    """Render all the standard diagnostic plots to png files, in parallel processes.
+
+    Parameters
+    ----------
+    output_directory: str, optional
+        Directory where the images are written to.
+        Defaults to 'results'.
+    data_file: str, optional
+    capacities_file: str, optional
+    params: tuple, optional
+    n_bins: int, optional
+        See `compute_diagnostic_figures`.
+    n_workers: int, optional
+        Number of worker processes.
+        Defaults to None, meaning the default of ProcessPoolExecutor.
+
+    Returns
+    -------
+    file_names: list
+        Names of the written image files.
+    """
+    figures = compute_diagnostic_figures(data_file, capacities_file, params, n_bins)
+    file_names = [os.path.join(output_directory, f'{name}.png') for name in figures]
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(render_figure, figures.values(), file_names))
+
+
+if __name__ == '__main__':
+    print(render_diagnostics())
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Differential regeneration of deployed frequency tables."""
+
+import csv
+import os
+import sys
+
+import numpy as np
+
+from scripts.analysis.find_best_capacity_index import find_best_capacity_values
+from scripts.compute_values.capacities import compute_capacity
+from scripts.compute_values.eigenfrequency_capacity import compute_capacity_for_given_eigenfrequency, \
+    compute_eigen_frequency
+from scripts.parameters import computed_params
+
+
+# Columns of the coil1 settings recomputed for each capacity box, in the order of the connection data.
+index_columns = ('c1', 'c2', 'c3', 'c1c2serial')
+
+
+def read_frequency_table(file_name):
+    """Read a frequency table, keeping the cells as they are written.
+
+    Parameters
+    ----------
+    file_name: str
+
+    Returns
+    -------
+    header: list
+        Column names.
+    rows: list
+        Rows of the table, as lists of strings.
+    """
+    with open(file_name, 'r', newline='') as file:
+        csv_reader = csv.reader(file, delimiter=',')
+        header = next(csv_reader)
+        rows = [row for row in csv_reader if row]
+    return header, rows
+
+
+def write_frequency_table(header, rows, file_name):
+    """Write a frequency table read by `read_frequency_table`."""
+    with open(file_name, 'w', newline='') as file:
+        csv_writer = csv.writer(file, delimiter=',', lineterminator='\n')
+        csv_writer.writerow(header)
+        csv_writer.writerows(rows)
+
+
+def table_column(header, rows, name):
+    """Return the column of the table as a float ndarray."""
+    i = header.index(name)
+    return np.array([float(row[i]) for row in rows])
+
+
+def box_settings(header, rows, box, coil):
+    """Return the settings of one coil of a capacity box as an array of shape (len(rows), 4).
+
+    Parameters
+    ----------
+    header: list
+    rows: list
+    box: str
+        Either 'cbox1' or 'cbox2'.
+    coil: str
+        Either 'coil1' or 'coil2'.
+
+    Returns
+    -------
+    out: ndarray
+        The (c1, c2, c3, connection type) indexes of each row.
+    """
+    return np.column_stack([table_column(header, rows, f'{box}_{coil}_{name}') for name in index_columns]).astype(int)
+
+
+def predicted_frequency_error(coil1_settings, coil2_settings, frequency, params=computed_params):
+    """Compute the relative error of the eigenfrequency predicted for the settings of a capacity box.
+
+    Both coils are connected in parallel, so their capacities add up.
+
+    Parameters
+    ----------
+    coil1_settings: ndarray
+    coil2_settings: ndarray
+        Arrays of shape (n, 4) of the (c1, c2, c3, connection type) indexes of both coils.
+    frequency: ndarray
+        Eigenfrequency the box is tuned to.
+    params: tuple, optional
+        Parameters of the eigenfrequency equation.
+        Defaults to `computed_params`.
+
+    Returns
+    -------
+    out: ndarray
+        (predicted - frequency) / frequency.
+    """
+    capacity = compute_capacity(*coil1_settings.T) + compute_capacity(*coil2_settings.T)
+    return compute_eigen_frequency(capacity, *params) / frequency - 1
+
+
+def diff_frequency_table(header, rows, params=computed_params, tolerance=1e-3, data_file='data/capacities.csv'):
+    """Recompute the coil1 settings of a deployed table and patch the rows where they improve noticeably.
+
+    For each capacity box, the coil1 settings are recomputed for the tuned frequency in one vectorized pass, the
+    coil2 settings of the table being kept and accounted for. A row is flagged when the recomputed settings of any box
+    differ from the deployed ones and reduce the absolute predicted frequency error by more than `tolerance`, only the
+    settings of that box being replaced. A recomputed zero capacity is written as the switched off setting, all the
+    indexes being 0. Rows with a zero echo time, the switched off setting, and boxes whose coil1 transformer is
+    enabled, which the eigenfrequency equation does not describe, are never changed.
+
+    Parameters
+    ----------
+    header: list
+    rows: list
+        Table, as returned by `read_frequency_table`.
+    params: tuple, optional
+        Parameters of the eigenfrequency equation.
+        Defaults to `computed_params`.
+    tolerance: float, optional
+        Relative frequency error tolerance.
+        Defaults to 1e-3.
+    data_file: str, optional
+        Capacities table used for the search.
+
+    Returns
+    -------
+    patched_rows: list
+        Copy of the rows, where only the changed coil1 settings are replaced.
+    flagged: ndarray
+        Boolean array, True for the flagged rows.
+    report: dict
+        Dictionary mapping each box to a dictionary with the 'old' and 'new' settings, the 'old_error' and
+        'new_error' relative predicted frequency errors and the 'changed' boolean array.
+    """
+    active = table_column(header, rows, 'echotime') != 0
+    flagged = np.zeros(len(rows), dtype=bool)
+    report = dict()
+
+    for box in ('cbox1', 'cbox2'):
+        frequency = table_column(header, rows, f'{box}_fg_freq')
+        old_settings = box_settings(header, rows, box, 'coil1')
+        coil2_settings = box_settings(header, rows, box, 'coil2')
+
+        desired_capacity = compute_capacity_for_given_eigenfrequency(frequency, params) - \
+            compute_capacity(*coil2_settings.T)
+        best_capacity, _, new_settings = find_best_capacity_values(desired_capacity, data_file)
+        new_settings = new_settings.astype(int)
+        # The capacities table keeps an arbitrary combination without capacity, write coil1 switched off instead
+        new_settings[best_capacity == 0] = 0
+
+        old_error = predicted_frequency_error(old_settings, coil2_settings, frequency, params)
+        new_error = predicted_frequency_error(new_settings, coil2_settings, frequency, params)
+
+        changed = np.any(new_settings != old_settings, axis=1) & (np.abs(old_error) - np.abs(new_error) > tolerance)
+        changed &= active & (table_column(header, rows, f'{box}_coil1_transformer') == 0)
+        flagged |= changed
+        report[box] = {'old': old_settings, 'new': new_settings, 'old_error': old_error, 'new_error': new_error,
+                       'changed': changed}
+
+    patched_rows = [list(row) for row in rows]
+    for box, values in report.items():
+        for i in np.flatnonzero(values['changed']):
+            for j, name in enumerate(index_columns):
+                patched_rows[i][header.index(f'{box}_coil1_{name}')] = str(values['new'][i, j])
+
+    return patched_rows, flagged, report
+
+
+def patch_frequency_table(file_name, output_file_name=None, params=computed_params, tolerance=1e-3,
+                          data_file='data/capacities.csv'):
+    """Check a deployed table against the current parameters and write the patched table.
+
+    Parameters
+    ----------
+    file_name: str
+    output_file_name: str, optional
+        Defaults to the name of the table with a '_patched' suffix.
+    params: tuple, optional
+    tolerance: float, optional
+    data_file: str, optional
+        See `diff_frequency_table`.
+
+    Returns
+    -------
+    output_file_name: str
+    flagged: ndarray
+    report: dict
+    """
+    header, rows = read_frequency_table(file_name)
+    patched_rows, flagged, report = diff_frequency_table(header, rows, params, tolerance, data_file)
+
+    if output_file_name is None:
+        root, extension = os.path.splitext(file_name)
+        output_file_name = f'{root}_patched{extension}'
+    write_frequency_table(header, patched_rows, output_file_name)
+
+    return output_file_name, flagged, report
+
+
+def main(file_names):
+    for file_name in file_names:
+        output_file_name, flagged, report = patch_frequency_table(file_name)
+        print(f'{file_name}: {np.count_nonzero(flagged)} of {len(flagged)} rows changed, written to {output_file_name}')
+
+        for box, values in report.items():
+            for i in np.flatnonzero(values['changed']):
+                print(f'    row {i + 1} {box}: {tuple(values["old"][i].tolist())} -> '
+                      f'{tuple(values["new"][i].tolist())}, '
+                      f'error {values["old_error"][i]:.2e} -> {values["new_error"][i]:.2e}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Monte Carlo analysis of the capacitor tolerances over all the capacity box combinations."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from scripts.analysis.compute_all_capacity_values import enumerate_combinations
+from scripts.capacity_boxes import capacity_box_1, capacity_box_2, capacity_box_3
+from scripts.compute_values.capacities import combine_box_capacities
+from scripts.compute_values.eigenfrequency_capacity import compute_eigen_frequency
+from scripts.parameters import capacity_tolerance, computed_params
+
+
+# Peak number of (chunk_size, n_samples) float arrays alive while a chunk is evaluated, as the box capacities, the
+# intermediate results of `combine_box_capacities` and `compute_eigen_frequency` and the statistics are temporaries.
+chunk_temporaries = 12
+# Maximum number of worker threads used by default.
+default_max_workers = 4
+
+
+def perturb_capacity_list(capacity_list, n_samples, tolerance=capacity_tolerance, distribution='uniform', rng=None):
+    """Draw perturbed values for each physical capacitor of a box.
+
+    Parameters
+    ----------
+    capacity_list: list
+        Nominal capacity values of the box.
+    n_samples: int
+        Number of Monte Carlo samples.
+    tolerance: float, optional
+        Relative tolerance of the capacitors.
+        Defaults to `capacity_tolerance`.
+    distribution: str, optional
+        Either 'uniform', meaning uniformly distributed within the tolerance, or 'normal', meaning the tolerance
+        is taken as three standard deviations.
+        Defaults to 'uniform'.
+    rng: numpy.random.Generator, optional
+        Random number generator.
+        Defaults to None, meaning a new unseeded generator.
+
+    Returns
+    -------
+    out: ndarray
+        Perturbed capacities of shape (n_samples, len(capacity_list)).
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    shape = (n_samples, len(capacity_list))
+    if distribution == 'uniform':
+        deviation = rng.uniform(-tolerance, tolerance, size=shape)
+    elif distribution == 'normal':
+        deviation = rng.normal(0, tolerance / 3, size=shape)
+    else:
+        raise ValueError(f'Unknown distribution: {distribution}')
+
+    return np.asarray(capacity_list, dtype=float) * (1 + deviation)
+
+
+def _frequency_spread_chunk(indexes, sampled_capacities, combinations, params):
+    """Compute the frequency statistics of a chunk of combinations.
+
+    Parameters
+    ----------
+    indexes: slice
+        Slice of the combinations to be computed.
+    sampled_capacities: tuple
+        Tuple of ndarrays of shape (max_index, n_samples) with the perturbed capacity for each box index.
+    combinations: tuple
+        Tuple of ndarrays (c1, c2, c3, serial).
+    params: tuple
+        Parameters of the eigenfrequency equation.
+
+    Returns
+    -------
+    out: tuple
+        Mean, standard deviation, minimum and maximum of the frequency of the chunk.
+    """
+    c1, c2, c3, serial = (values[indexes] for values in combinations)
+    capacity = combine_box_capacities(sampled_capacities[0][c1], sampled_capacities[1][c2],
+                                      sampled_capacities[2][c3], serial)
+    frequency = compute_eigen_frequency(capacity, *params)
+    return frequency.mean(axis=1), frequency.std(axis=1), frequency.min(axis=1), frequency.max(axis=1)
+
+
+def monte_carlo_frequency_spread(n_samples=1000, tolerance=capacity_tolerance, distribution='uniform',
+                                 params=computed_params, chunk_size=None, n_workers=None, seed=None,
+                                 memory_budget=128 * 2 ** 20):
+    """Propagate the capacitor tolerances to the eigenfrequency of every box combination.
+
+    Each sample is one realization of all the physical capacitors, shared by all the combinations. The combinations
+    are processed in chunks evaluated in parallel threads. Each chunk needs about `chunk_temporaries` arrays of
+    `chunk_size * n_samples` floats at once, so by default the chunk size is chosen for all the workers together to
+    stay within `memory_budget`, on top of a few arrays of one value per combination.
+
+    Parameters
+    ----------
+    n_samples: int, optional
+        Number of Monte Carlo samples.
+        Defaults to 1000.
+    tolerance: float, optional
+        Relative tolerance of the capacitors.
+        Defaults to `capacity_tolerance`.
+    distribution: str, optional
+        Distribution of the capacitor deviations, see `perturb_capacity_list`.
+        Defaults to 'uniform'.
+    params: tuple, optional
+        Parameters of the eigenfrequency equation.
+        Defaults to `computed_params`.
+    chunk_size: int, optional
+        Number of combinations evaluated at once.
+        Defaults to None, meaning the largest chunk size fitting in `memory_budget`.
+    n_workers: int, optional
+        Number of worker threads.
+        Defaults to None, meaning the number of CPUs up to `default_max_workers`.
+    seed: int, optional
+        Seed of the random number generator.
+        Defaults to None.
+    memory_budget: int, optional
+        Memory [bytes] for the chunks being evaluated, used if `chunk_size` is None.
+        Defaults to 128 MiB.
+
+    Returns
+    -------
+    combinations: tuple
+        Tuple of ndarrays (c1, c2, c3, serial).
+    nominal_frequency: ndarray
+        Eigenfrequency of each combination for the nominal capacities.
+    mean_frequency: ndarray
+    frequency_spread: ndarray
+        Standard deviation of the eigenfrequency of each combination.
+    minimum_frequency: ndarray
+    maximum_frequency: ndarray
+    """
+    rng = np.random.default_rng(seed)
+    combinations = enumerate_combinations()
+
+    sampled_capacities = list()
+    for box in (capacity_box_1, capacity_box_2, capacity_box_3):
+        samples = perturb_capacity_list(box.capacity_list, n_samples, tolerance, distribution, rng)
+        sampled_capacities.append(box.index_to_capacity_array(np.arange(box.max_index + 1), samples))
+
+    nominal_frequency = compute_eigen_frequency(
+        combine_box_capacities(capacity_box_1.index_to_capacity_array(combinations[0]),
+                               capacity_box_2.index_to_capacity_array(combinations[1]),
+                               capacity_box_3.index_to_capacity_array(combinations[2]),
+                               combinations[3]), *params)
+
+    if n_workers is None:
+        n_workers = min(default_max_workers, os.cpu_count() or 1)
+    if chunk_size is None:
+        chunk_size = max(1, memory_budget // (n_workers * chunk_temporaries * n_samples * np.dtype(float).itemsize))
+
+    n_combinations = len(combinations[0])
+    chunks = [slice(start, min(start + chunk_size, n_combinations)) for start in range(0, n_combinations, chunk_size)]
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        results = list(executor.map(
+            lambda chunk: _frequency_spread_chunk(chunk, sampled_capacities, combinations, params), chunks))
+
+    mean_frequency, frequency_spread, minimum_frequency, maximum_frequency = (
+        np.concatenate(values) for values in zip(*results))
+
+    return combinations, nominal_frequency, mean_frequency, frequency_spread, minimum_frequency, maximum_frequency
+
+
+def find_robust_combination(eigenfrequency, spread_data, weight=1, max_error=None):
+    """Find the combination closest to the desired eigenfrequency while preferring small tolerance spreads.
+
+    Parameters
+    ----------
+    eigenfrequency: float
+        Desired eigenfrequency.
+    spread_data: tuple
+        Output of `monte_carlo_frequency_spread`.
+    weight: float, optional
+        Weight of the frequency spread against the nominal frequency error in the score.
+        Defaults to 1.
+    max_error: float, optional
+        If given, only combinations whose nominal frequency error is below it are considered, if there are any.
+        Defaults to None.
+
+    Returns
+    -------
+    connection_data: tuple
+        Tuple containing the indexes for the capacity boxes and the connection type (serial/parallel).
+    nominal_frequency: float
+        Nominal eigenfrequency of the chosen combination.
+    frequency_spread: float
+        Standard deviation of the eigenfrequency of the chosen combination.
+    """
+    combinations, nominal_frequency, _, frequency_spread = spread_data[:4]
+
+    error = np.abs(nominal_frequency - eigenfrequency)
+    score = error + weight * frequency_spread
+
+    if max_error is not None and np.any(error <= max_error):
+        score = np.where(error <= max_error, score, np.inf)
+
+    best = int(np.nanargmin(score))
+    connection_data = tuple(int(values[best]) for values in combinations)
+
+    return connection_data, nominal_frequency[best], frequency_spread[best]
+
+
+def main():
+    spread_data = monte_carlo_frequency_spread(n_samples=1000, seed=0)
+    print(find_robust_combination(200000, spread_data, max_error=500))
+
+
+if __name__ == '__main__':
+    main()
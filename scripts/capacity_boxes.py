@@ -11,6 +11,8 @@
 
 from copy import deepcopy
 
+import numpy as np
+
 from scripts.parameters import capacity_box_1_list, capacity_box_2_list, capacity_box_3_list
 from scripts.utils import convert_decimal_to_binary, convert_binary_to_decimal
 
@@ -53,6 +55,71 @@ class CapacityBoxes:
 
         return capacity
 
+    def index_to_bits(self, index):
+        """Convert an array of indexes to the matrix of relay states.
+
+        Parameters
+        ----------
+        index: int, ndarray
+            Index or indexes of the capacity box.
+
+        Returns
+        -------
+        out: ndarray
+            Array of shape (len(index), len(capacity_list)) holding 1 where the corresponding capacitor is active.
+        """
+        index = np.atleast_1d(np.asarray(index, dtype=np.int64))
+        return (index[:, np.newaxis] >> np.arange(len(self.capacity_list))) & 1
+
+    def index_to_capacity_array(self, index, capacity_list=None):
+        """Vectorized version of `index_to_capacity`.
+
+        Parameters
+        ----------
+        index: int, ndarray
+            Index or indexes of the capacity box.
+        capacity_list: ndarray, optional
+            Capacity values to be used instead of the nominal ones, e.g. perturbed values. Either of shape
+            (len(capacity_list),) or (n_samples, len(capacity_list)).
+            Defaults to None, meaning the nominal capacity list.
+
+        Returns
+        -------
+        capacity: ndarray
+            Capacity for each index, of shape (len(index),) or (len(index), n_samples).
+        """
+        if capacity_list is None:
+            capacity_list = self.capacity_list
+        capacity_list = np.asarray(capacity_list, dtype=float)
+        bits = self.index_to_bits(index)
+
+        # Sum in the same order as `index_to_capacity`, so that the results are identical
+        capacity = np.zeros(bits.shape[:1] + capacity_list.shape[:-1])
+        for cap_index in range(len(self.capacity_list)):
+            capacity = capacity + np.multiply.outer(bits[:, cap_index], capacity_list[..., cap_index])
+
+        return capacity
+
+    def index_to_picofarad_array(self, index):
+        """Exact integer version of `index_to_capacity_array`, in picofarad.
+
+        Parameters
+        ----------
+        index: int, ndarray
+            Index or indexes of the capacity box.
+
+        Returns
+        -------
+        capacity: ndarray
+            Capacity [pF] for each index, as int64.
+        """
+        capacity_list = np.asarray(self.capacity_list, dtype=float) * 1000
+        picofarad_list = np.rint(capacity_list).astype(np.int64)
+        if not np.allclose(capacity_list, picofarad_list, rtol=0, atol=1e-6):
+            raise ValueError(f'The capacities {self.capacity_list} are not whole picofarads.')
+
+        return self.index_to_bits(index) @ picofarad_list
+
     def capacity_to_index(self, capacity, return_remainder=True, decimal='True'):
         """Convert capacity to an index value.
 
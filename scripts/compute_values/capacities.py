@@ -16,7 +16,8 @@ from scripts.utils import add_inverse
 from scripts.parameters import inductance
 
 
-def parasitic_capacity_calculation(capacity, effective_frequency, connection_type='parallel'):
+def parasitic_capacity_calculation(capacity, effective_frequency, connection_type='parallel',
+                                   inductance_value=inductance):
     """Compute the parasitic capacity assuming that it contributes either as a serial or parallel connection.
 
     Parameters
@@ -28,19 +29,91 @@ def parasitic_capacity_calculation(capacity, effective_frequency, connection_typ
     connection_type: str, optional
         Either 'serial' or 'parallel'.
         Defaults to 'serial'.
+    inductance_value: float, ndarray, optional
+        Inductance of the circuit, or of each point.
+        Defaults to `inductance`.
 
     Returns
     -------
     out: float
         Parasitic capacity.
     """
-    capacity_theo = (2 * np.pi * effective_frequency) ** -2 / inductance
+    capacity_theo = (2 * np.pi * effective_frequency) ** -2 / inductance_value
     if connection_type == 'serial':
         return capacity_theo - capacity
     else:
         return capacity_theo * capacity / (capacity - capacity_theo)
 
 
+def estimate_parasitic_capacity(capacity_values, measured_frequency, connection_type='parallel',
+                                inductance_value=inductance):
+    """Estimate the parasitic capacity of the cables from a whole measurement set.
+
+    Parameters
+    ----------
+    capacity_values: ndarray
+        Capacities of the measured points.
+    measured_frequency: ndarray
+        Measured effective frequencies.
+    connection_type: str, optional
+        Either 'serial' or 'parallel', see `parasitic_capacity_calculation`.
+        Defaults to 'parallel'.
+    inductance_value: float, ndarray, optional
+        Inductance of the circuit, or the measured inductance of each point.
+        Defaults to `inductance`.
+
+    Returns
+    -------
+    out: float
+        Median of the parasitic capacities of the single points.
+
+    Raises
+    ------
+    ValueError
+        If the median is not a positive capacity, i.e. the connection type does not describe the measurements.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        parasitic_capacity = parasitic_capacity_calculation(np.asarray(capacity_values), np.asarray(measured_frequency),
+                                                            connection_type, np.asarray(inductance_value))
+    parasitic_capacity = parasitic_capacity[np.isfinite(parasitic_capacity)]
+
+    median = float(np.median(parasitic_capacity)) if len(parasitic_capacity) else np.nan
+    if not median > 0:
+        raise ValueError(f'Non-physical parasitic capacity {median} for the {connection_type} connection type.')
+    return median
+
+
+def add_parasitic_capacity(capacity, parasitic_capacity, connection_type='parallel'):
+    """Compute the effective capacity of the circuit including the parasitic capacity.
+
+    This is the inverse of `parasitic_capacity_calculation`.
+
+    Parameters
+    ----------
+    capacity: float, ndarray
+        Capacity of the boxes.
+    parasitic_capacity: float
+        Non negative parasitic capacity, 0 meaning no parasitic capacity.
+    connection_type: str, optional
+        Either 'serial' or 'parallel'.
+        Defaults to 'parallel'.
+
+    Returns
+    -------
+    out: float, ndarray
+        Effective capacity.
+    """
+    if not parasitic_capacity >= 0:
+        raise ValueError(f'Non-physical parasitic capacity {parasitic_capacity}.')
+
+    if connection_type == 'serial':
+        return capacity + parasitic_capacity
+    elif parasitic_capacity == 0:
+        return capacity
+    else:
+        return add_inverse(capacity, parasitic_capacity)
+
+
 def compute_capacity_values(capacity_1, capacity_2, connection_type):
     """Compute the capacity values from the data table.
 
@@ -55,10 +128,7 @@ def compute_capacity_values(capacity_1, capacity_2, connection_type):
     capacity_values: ndarray
         List of capacity values.
     """
-    capacity_values = []
-    for i in range(len(capacity_1)):
-        capacity_values.append(compute_capacity(capacity_1[i], capacity_2[i], serial=connection_type[i]))
-    return np.asarray(capacity_values)
+    return np.asarray(compute_capacity(capacity_1, capacity_2, serial=connection_type))
 
 
 def compute_capacity(c1, c2, c3=0, serial=0):
@@ -66,23 +136,30 @@ def compute_capacity(c1, c2, c3=0, serial=0):
 
     Parameters
     ----------
-    c1: int
+    c1: int, ndarray
         Index for the first capacity box.
-    c2: int
+    c2: int, ndarray
         Index for the second capacity box.
-    c3: int, optional
+    c3: int, ndarray, optional
         Index for the third capacity box.
         Defaults to 0.
-    serial: int
+    serial: int, ndarray
         Flag indicating whether to connect the boxes in series or in parallel.
     Returns
     -------
-    out: float
-        Capacity.
+    out: float, ndarray
+        Capacity, as float if all the inputs are scalars.
 
     >>> compute_capacity(5, 4, 0, 1)
     1.9655172413793106e-09
     """
+    if np.ndim(c1) or np.ndim(c2) or np.ndim(c3) or np.ndim(serial):
+        c1, c2, c3, serial = np.broadcast_arrays(c1, c2, c3, serial)
+        capacity = combine_box_capacities(capacity_box_1.index_to_capacity_array(c1.ravel()),
+                                          capacity_box_2.index_to_capacity_array(c2.ravel()),
+                                          capacity_box_3.index_to_capacity_array(c3.ravel()), serial.ravel())
+        return capacity.reshape(c1.shape)
+
     if serial == 0:
         cbox1 = capacity_box_1.index_to_capacity(int(c1)) + capacity_box_2.index_to_capacity(int(c2))
     elif serial == 1:
@@ -100,29 +177,146 @@ def compute_capacity(c1, c2, c3=0, serial=0):
         return add_inverse(cbox1 * 1e-9, cbox2 * 1e-9)
 
 
+def combine_box_capacities(capacity_1, capacity_2, capacity_3, serial):
+    """Combine the capacities of the three boxes the same way as `compute_capacity`, element-wise.
+
+    Parameters
+    ----------
+    capacity_1: float, ndarray
+        Capacity of the first box [nF].
+    capacity_2: float, ndarray
+        Capacity of the second box [nF].
+    capacity_3: float, ndarray
+        Capacity of the third box [nF].
+    serial: int, ndarray
+        Flag indicating whether to connect the first two boxes in series or in parallel. If the capacities have more
+        dimensions than `serial`, it is broadcast along the first axis.
+
+    Returns
+    -------
+    out: float, ndarray
+        Capacity [F].
+    """
+    serial = np.asarray(serial)
+    serial = serial.reshape(serial.shape + (1,) * (np.ndim(capacity_1) - serial.ndim))
+
+    cbox1 = np.where(serial == 0, np.add(capacity_1, capacity_2), add_inverse(capacity_1, capacity_2))
+    cbox2 = np.asarray(capacity_3)
+
+    return np.where(cbox2 == 0, cbox1 * 1e-9,
+                    np.where(cbox1 == 0, cbox2 * 1e-9, add_inverse(cbox1 * 1e-9, cbox2 * 1e-9)))
+
+
+def combine_box_capacities_exact(capacity_1, capacity_2, capacity_3, serial):
+    """Exact version of `combine_box_capacities` on integer picofarads.
+
+    Parallel connections only add integers. A series connection a * b / (a + b) is kept as a rational number, so the
+    total capacity is returned as a numerator and a denominator, reduced to lowest terms. Equal capacities reached by
+    different combinations therefore have the same representation.
+
+    Parameters
+    ----------
+    capacity_1: int, ndarray
+        Capacity of the first box [pF].
+    capacity_2: int, ndarray
+        Capacity of the second box [pF].
+    capacity_3: int, ndarray
+        Capacity of the third box [pF].
+    serial: int, ndarray
+        Flag indicating whether to connect the first two boxes in series or in parallel.
+
+    Returns
+    -------
+    numerator: ndarray
+    denominator: ndarray
+        The capacity [pF] is numerator / denominator, both int64.
+    """
+    capacity_1, capacity_2, capacity_3, serial = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.int64) for value in (capacity_1, capacity_2, capacity_3, serial)))
+
+    # As for add_inverse, a series connection with an empty box is open
+    numerator = np.where(serial == 0, capacity_1 + capacity_2, capacity_1 * capacity_2)
+    denominator = np.where((serial == 0) | (numerator == 0), 1, capacity_1 + capacity_2)
+
+    in_series = (capacity_3 != 0) & (numerator != 0)
+    numerator, denominator = (np.where(in_series, numerator * capacity_3, numerator + capacity_3),
+                              np.where(in_series, numerator + capacity_3 * denominator, denominator))
+
+    divisor = np.gcd(numerator, denominator)
+    return numerator // divisor, denominator // divisor
+
+
+def exact_capacity_to_float(numerator, denominator):
+    """Convert exact capacities from `combine_box_capacities_exact` to float.
+
+    Parameters
+    ----------
+    numerator: ndarray
+    denominator: ndarray
+
+    Returns
+    -------
+    out: ndarray
+        Capacity [F].
+    """
+    return np.asarray(numerator) / np.asarray(denominator) * 1e-12
+
+
+def exact_capacity_sort_key(numerator, denominator):
+    """Compute integer keys ordering the exact capacities from `combine_box_capacities_exact`.
+
+    The key is the capacity [pF] in fixed point, floor(numerator / denominator * 2 ** shift), with the largest shift
+    for which the computation fits in int64. Two capacities differing by more than 2 ** -shift pF have different keys.
+
+    Parameters
+    ----------
+    numerator: ndarray
+    denominator: ndarray
+
+    Returns
+    -------
+    key: ndarray
+        int64 keys, increasing with the capacity.
+    shift: int
+        Number of fractional bits of the keys.
+    """
+    numerator = np.asarray(numerator, dtype=np.int64)
+    denominator = np.asarray(denominator, dtype=np.int64)
+
+    whole, remainder = np.divmod(numerator, denominator)
+    shift = 62 - max(int(denominator.max(initial=1)).bit_length(), int(whole.max(initial=0)).bit_length())
+    if shift < 0:
+        raise ValueError('The capacities are too large to be keyed in int64.')
+
+    return (whole << shift) + (remainder << shift) // denominator, shift
+
+
 def compute_total_capacity(c1, c2, c3, serial):
     """Compute the total capacity from the three boxes.
 
     Parameters
     ----------
-    c1: float
+    c1: float, ndarray
         First box capacity, can be connected either in serial or in parallel.
-    c2: float
+    c2: float, ndarray
         Second box capacity, can be connected either in serial or in parallel.
-    c3: float
+    c3: float, ndarray
         Third box capacity, can be connected only in serial.
-    serial: bool
+    serial: bool, ndarray
         Flag indicating whether to connected the first two boxes in serial or in parallel.
 
     Returns
     -------
-    c_total: float
+    c_total: float, ndarray
         Total capacity of the circuit.
     """
-    if serial == 0:
-        c12 = c1 + c2
+    if np.ndim(serial) == 0:
+        if serial == 0:
+            c12 = c1 + c2
+        else:
+            c12 = add_inverse(c1, c2)
     else:
-        c12 = add_inverse(c1, c2)
+        c12 = np.where(np.asarray(serial) == 0, np.add(c1, c2), add_inverse(c1, c2))
 
     c_total = add_inverse(c12, c3)
 
@@ -13,7 +13,7 @@ import numpy as np
 from scripts.parameters import inductance, computed_params
 
 
-def compute_eigen_frequency(circuit_capacity, a=1, n=1 / 2, b=0, d=0):
+def compute_eigen_frequency(circuit_capacity, a=1, n=1 / 2, b=0, d=0, inductance_value=inductance):
     """Compute the eigenfrequency.
 
     Parameters
@@ -28,6 +28,9 @@ def compute_eigen_frequency(circuit_capacity, a=1, n=1 / 2, b=0, d=0):
         X axis off set.
     d: float
         Y axis off set.
+    inductance_value: float, ndarray, optional
+        Inductance of the circuit, or of each point, broadcast against `circuit_capacity`.
+        Defaults to `inductance`.
 
     Returns
     -------
@@ -40,26 +43,30 @@ def compute_eigen_frequency(circuit_capacity, a=1, n=1 / 2, b=0, d=0):
     >>> compute_eigen_frequency(1.9655172413793106e-09)
     757658.5527526588
     """
-    prefactor = 1 / (2 * np.pi * np.sqrt(inductance))
+    prefactor = 1 / (2 * np.pi * np.sqrt(inductance_value))
     return prefactor * a * (np.asarray(circuit_capacity + b) ** (-n)) + d
 
 
-def compute_capacity_for_given_eigenfrequency(eigenfrequency, params=computed_params):
+def compute_capacity_for_given_eigenfrequency(eigenfrequency, params=computed_params, inductance_value=inductance):
     """
 
     Parameters
     ----------
-    eigenfrequency: float
+    eigenfrequency: float, ndarray
         Frequency to be have the capacity computed at.
     params: tuple
         Tuple of parameters used for the eigenfrequency computation.
+    inductance_value: float, ndarray, optional
+        Inductance of the circuit, e.g. the measured inductance of the coil to be tuned, broadcast against
+        `eigenfrequency`.
+        Defaults to `inductance`.
 
     Returns
     -------
-    capacity: float
+    capacity: float, ndarray
         Computed capacity needed for the given eigenfrequency.
 
     """
     a, n, b, d = params
-    capacity = ((eigenfrequency - d) * (2 * np.pi * np.sqrt(inductance)) / a) ** (-1/n) - b
+    capacity = ((eigenfrequency - d) * (2 * np.pi * np.sqrt(inductance_value)) / a) ** (-1/n) - b
     return capacity
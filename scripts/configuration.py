@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Configuration of one instrument setup, with its own capacity index and fitted parameters cache."""
+
+import threading
+
+import numpy as np
+
+from scripts import parameters
+from scripts.analysis.compute_all_capacity_values import unique_combinations
+from scripts.analysis.find_best_capacity_index import find_nearest_capacities
+from scripts.capacity_boxes import CapacityBoxes
+from scripts.compute_values.capacities import combine_box_capacities, exact_capacity_sort_key, \
+    exact_capacity_to_float
+from scripts.compute_values.eigenfrequency_capacity import compute_capacity_for_given_eigenfrequency, \
+    compute_eigen_frequency
+from scripts.utils import read_data_from_file
+
+
+class InstrumentConfiguration:
+    """Class bundling the parameters of one instrument setup.
+
+    The capacity index and the fitted parameters are built lazily on first use and are private to each instance, so
+    that several configurations can be served from the same process. All the lookups are safe to be called from
+    concurrent threads.
+    """
+
+    def __init__(self, capacity_box_1_list=parameters.capacity_box_1_list,
+                 capacity_box_2_list=parameters.capacity_box_2_list,
+                 capacity_box_3_list=parameters.capacity_box_3_list, inductance=parameters.inductance,
+                 computed_params=parameters.computed_params, mass_neutron=parameters.mass_neutron,
+                 h_planck_constant=parameters.h_planck_constant, wavelength=parameters.wavelength,
+                 length=parameters.length, name='default'):
+        """
+
+        Parameters
+        ----------
+        capacity_box_1_list: list, optional
+        capacity_box_2_list: list, optional
+        capacity_box_3_list: list, optional
+            Available capacities of the three boxes, ordered from smallest to largest.
+        inductance: float, optional
+        computed_params: tuple, optional
+            Parameters of the eigenfrequency equation.
+        mass_neutron: float, optional
+        h_planck_constant: float, optional
+        wavelength: float, optional
+        length: float, optional
+        name: str, optional
+            Name of the setup, e.g. of the spectrometer arm.
+
+        All the values default to the ones in `scripts.parameters`.
+        """
+        self.name = name
+
+        self.capacity_box_1 = CapacityBoxes(capacity_list=tuple(capacity_box_1_list))
+        self.capacity_box_2 = CapacityBoxes(capacity_list=tuple(capacity_box_2_list))
+        self.capacity_box_3 = CapacityBoxes(capacity_list=tuple(capacity_box_3_list))
+
+        self.inductance = inductance
+        self.computed_params = tuple(computed_params)
+        self.mass_neutron = mass_neutron
+        self.h_planck_constant = h_planck_constant
+        self.wavelength = wavelength
+        self.length = length
+
+        self._lock = threading.Lock()
+        self._capacity_index = None
+        self._fitted_params = dict()
+
+    @property
+    def boxes(self):
+        """Return the three capacity boxes of the setup."""
+        return self.capacity_box_1, self.capacity_box_2, self.capacity_box_3
+
+    def compute_capacity(self, c1, c2, c3=0, serial=0):
+        """Compute the capacity for the given box indexes, see `scripts.compute_values.capacities.compute_capacity`.
+
+        Parameters
+        ----------
+        c1: int, ndarray
+        c2: int, ndarray
+        c3: int, ndarray, optional
+        serial: int, ndarray, optional
+
+        Returns
+        -------
+        out: ndarray
+            Capacity.
+        """
+        return combine_box_capacities(self.capacity_box_1.index_to_capacity_array(c1),
+                                      self.capacity_box_2.index_to_capacity_array(c2),
+                                      self.capacity_box_3.index_to_capacity_array(c3), serial)
+
+    @property
+    def capacity_index(self):
+        """Return the capacity index, building it on first access.
+
+        Returns
+        -------
+        capacities: ndarray
+            All the distinct possible capacities, sorted in increasing order.
+        connection_data: ndarray
+            Array of shape (len(capacities), 4) containing the indexes for the capacity boxes and the connection type.
+        """
+        if self._capacity_index is None:
+            with self._lock:
+                if self._capacity_index is None:
+                    self._capacity_index = self._build_capacity_index()
+        return self._capacity_index
+
+    def _build_capacity_index(self):
+        """Enumerate all the combinations of the boxes and sort them by capacity.
+
+        The capacities are deduplicated exactly by `unique_combinations`, which keeps the last enumerated combination
+        as `compute_all_possible_capacities` does.
+        """
+        numerator, denominator, connection_data = unique_combinations(self.boxes)
+
+        key, _ = exact_capacity_sort_key(numerator, denominator)
+        order = np.argsort(key, kind='stable')
+
+        return exact_capacity_to_float(numerator[order], denominator[order]), connection_data[order]
+
+    def find_best_capacity_values(self, desired_capacities):
+        """Return the closest possible capacities to the desired ones.
+
+        Parameters
+        ----------
+        desired_capacities: float, ndarray
+
+        Returns
+        -------
+        out: tuple
+            Best capacities, errors and connection data, see `find_nearest_capacities`.
+        """
+        capacities, connection_data = self.capacity_index
+        return find_nearest_capacities(capacities, connection_data, np.atleast_1d(desired_capacities))
+
+    def compute_eigen_frequency(self, circuit_capacity, params=None):
+        """Compute the eigenfrequency with the parameters of the setup."""
+        if params is None:
+            params = self.computed_params
+        return compute_eigen_frequency(circuit_capacity, *params, inductance_value=self.inductance)
+
+    def compute_capacity_for_given_eigenfrequency(self, eigenfrequency, params=None, inductance_value=None):
+        """Compute the capacity needed for the eigenfrequency with the parameters of the setup.
+
+        The inductance defaults to the one of the setup, and can be given per eigenfrequency for coils that differ.
+        """
+        if params is None:
+            params = self.computed_params
+        if inductance_value is None:
+            inductance_value = self.inductance
+        return compute_capacity_for_given_eigenfrequency(eigenfrequency, params, inductance_value=inductance_value)
+
+    def lookup(self, eigenfrequency, inductance_value=None):
+        """Find the box settings for the given eigenfrequencies.
+
+        Parameters
+        ----------
+        eigenfrequency: float, ndarray
+        inductance_value: float, ndarray, optional
+            Inductance of the coil to be tuned, broadcast against `eigenfrequency`.
+            Defaults to None, meaning the inductance of the setup.
+
+        Returns
+        -------
+        best_capacities: ndarray
+        errors: ndarray
+            The absolute differences between the output and the desired capacities.
+        connection_data: ndarray
+            Array of shape (n, 4) containing the indexes for the capacity boxes and the connection type.
+        """
+        return self.find_best_capacity_values(
+            self.compute_capacity_for_given_eigenfrequency(eigenfrequency, inductance_value=inductance_value))
+
+    def mieze_time(self, chopping_frequency_value):
+        """Compute the mieze time with the neutron parameters of the setup."""
+        return ((self.mass_neutron / self.h_planck_constant) ** 2) * (self.wavelength ** 3) * \
+            chopping_frequency_value * self.length
+
+    def fitted_params(self, data_file='data/data.csv', measured_inductance=False):
+        """Return the eigenfrequency parameters fitted to the measurements of the setup, fitting on first use.
+
+        Parameters
+        ----------
+        data_file: str, optional
+            File containing the measured frequencies.
+            Defaults to 'data/data.csv'.
+        measured_inductance: bool, optional
+            Flag indicating whether to fit with the measured inductance of each point, the inductance of the setup
+            being used for the points without one.
+            Defaults to False.
+
+        Returns
+        -------
+        params: tuple
+        """
+        key = data_file, measured_inductance
+        with self._lock:
+            if key not in self._fitted_params:
+                from scripts.analysis.optimize import fit_eigen_frequency
+
+                measured_frequency, capacity_1, capacity_2, connection_type, inductance_values = read_data_from_file(
+                    data_file, read_inductance=True, default_inductance=self.inductance)
+                if not measured_inductance:
+                    inductance_values = self.inductance
+                capacity_values = self.compute_capacity(capacity_1, capacity_2, 0, connection_type)
+                self._fitted_params[key] = tuple(
+                    fit_eigen_frequency(capacity_values, measured_frequency, inductance_value=inductance_values))
+            return self._fitted_params[key]
+
+
+# Configuration of the setup defined in `scripts.parameters`.
+default_configuration = InstrumentConfiguration()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Cache of the results of repeated eigenfrequency requests."""
+
+import threading
+from collections import OrderedDict
+
+from scripts import parameters
+
+
+def parameters_fingerprint():
+    """Return a hashable snapshot of the parameters the results depend on.
+
+    The values are read from `scripts.parameters` on each call, so that a recalibration, i.e. new `computed_params`, a
+    new inductance or new capacity box lists, changes the fingerprint. The cached computation has to read the same
+    values from `scripts.parameters`, see `main.compute_settings`.
+
+    Returns
+    -------
+    out: tuple
+    """
+    return (tuple(parameters.computed_params), parameters.inductance, tuple(parameters.capacity_box_1_list),
+            tuple(parameters.capacity_box_2_list), tuple(parameters.capacity_box_3_list))
+
+
+class FrequencyCache:
+    """Bounded least recently used cache of results computed from an eigenfrequency.
+
+    The entries are keyed on the eigenfrequency rounded to `resolution` and on the fingerprint of the parameters.
+    All the entries are dropped as soon as the fingerprint changes, so no result of previous parameters is returned.
+    """
+
+    def __init__(self, maxsize=128, resolution=1, fingerprint=parameters_fingerprint):
+        """
+
+        Parameters
+        ----------
+        maxsize: int, optional
+            Maximum number of stored results.
+            Defaults to 128.
+        resolution: float, optional
+            Frequencies [Hz] closer than the resolution share the same result.
+            Defaults to 1 Hz.
+        fingerprint: callable, optional
+            Function returning the hashable state of the parameters.
+            Defaults to `parameters_fingerprint`.
+        """
+        self.maxsize = maxsize
+        self.resolution = resolution
+        self.fingerprint = fingerprint
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._fingerprint = None
+
+    def quantize(self, eigenfrequency):
+        """Return the eigenfrequency rounded to the resolution of the cache."""
+        return round(eigenfrequency / self.resolution) * self.resolution
+
+    def get(self, eigenfrequency, compute):
+        """Return the result for the eigenfrequency, computing it on a miss.
+
+        Parameters
+        ----------
+        eigenfrequency: float
+        compute: callable
+            Function computing the result from the quantized eigenfrequency.
+
+        Returns
+        -------
+        out:
+            The result of `compute`.
+        """
+        fingerprint = self.fingerprint()
+        key = round(eigenfrequency / self.resolution)
+
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._fingerprint = fingerprint
+
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        result = compute(self.quantize(eigenfrequency))
+
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        return result
+
+    def clear(self):
+        """Drop all the entries, keeping the counters."""
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def statistics(self):
+        """Return the counters and the current size of the cache.
+
+        Returns
+        -------
+        out: dict
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'invalidations': self.invalidations, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self._entries)
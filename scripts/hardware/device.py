@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Interface to the devices driving the capacity boxes."""
+
+import asyncio
+from abc import ABC, abstractmethod
+
+
+class CapacityBoxDevice(ABC):
+    """Base class of the devices the settings of a frequency table row are pushed to.
+
+    Implementations define the two coroutines, which are awaited one row after the other.
+    """
+
+    @abstractmethod
+    async def apply(self, settings):
+        """Apply the settings.
+
+        Parameters
+        ----------
+        settings: dict
+            Dictionary mapping the frequency table columns to their values.
+        """
+
+    @abstractmethod
+    async def confirm(self, settings):
+        """Check that the settings are active on the hardware.
+
+        Parameters
+        ----------
+        settings: dict
+            Settings that were applied.
+
+        Returns
+        -------
+        out: bool
+            Flag indicating whether the settings were confirmed.
+        """
+
+
+class SimulatedDevice(CapacityBoxDevice):
+    """Local device simulating the switching and read back times of the hardware."""
+
+    def __init__(self, apply_time=0.01, confirm_time=0.005):
+        """
+
+        Parameters
+        ----------
+        apply_time: float, optional
+            Time [s] needed to apply the settings.
+            Defaults to 0.01.
+        confirm_time: float, optional
+            Time [s] needed to read the settings back.
+            Defaults to 0.005.
+        """
+        self.apply_time = apply_time
+        self.confirm_time = confirm_time
+
+        self.state = dict()
+        self.history = list()
+
+    async def apply(self, settings):
+        await asyncio.sleep(self.apply_time)
+        self.state = dict(settings)
+        self.history.append(self.state)
+
+    async def confirm(self, settings):
+        await asyncio.sleep(self.confirm_time)
+        return self.state == settings
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Pipelined push of the computed settings to the capacity boxes."""
+
+import asyncio
+import time
+
+import numpy as np
+
+from scripts.analysis.compute_frequency_table import chopping_frequency, compute_frequency2_from_frequency1, timebin
+from scripts.analysis.find_best_capacity_index import find_best_capacity_values
+from scripts.compute_values.eigenfrequency_capacity import compute_capacity_for_given_eigenfrequency
+from scripts.parameters import computed_params, n_digits
+from scripts.utils import transform_frequency
+
+
+def compute_settings(frequency1, params=computed_params):
+    """Compute the hardware settings of one row of the frequency table.
+
+    Parameters
+    ----------
+    frequency1: float
+        Eigenfrequency of the first capacity box.
+    params: tuple, optional
+        Parameters of the eigenfrequency equation.
+        Defaults to `computed_params`.
+
+    Returns
+    -------
+    settings: dict
+        Dictionary mapping the frequency table columns to their values.
+    """
+    frequency2 = compute_frequency2_from_frequency1(frequency1)
+    capacities = compute_capacity_for_given_eigenfrequency(np.array([frequency1, frequency2], dtype=float), params)
+    _, _, connection_data = find_best_capacity_values(capacities)
+
+    settings = dict()
+    for box, frequency, (c1, c2, c3, connection_type) in zip(('cbox1', 'cbox2'), (frequency1, frequency2),
+                                                             connection_data):
+        settings[f'{box}_coil1_c1'] = int(c1)
+        settings[f'{box}_coil1_c1c2serial'] = int(connection_type)
+        settings[f'{box}_coil1_c2'] = int(c2)
+        settings[f'{box}_coil1_c3'] = int(c3)
+        settings[f'{box}_fg_freq'] = round(frequency, n_digits)
+
+    chopping_frequency_value = chopping_frequency(frequency1, frequency2)
+    settings['hrf1'] = transform_frequency(frequency1)
+    settings['hrf2'] = transform_frequency(frequency2)
+    settings['psd_chop_freq'] = round(chopping_frequency_value, n_digits)
+    settings['psd_timebin_freq'] = round(timebin(chopping_frequency_value), n_digits)
+
+    return settings
+
+
+async def run_scan(frequencies, device, compute=compute_settings, queue_size=2):
+    """Compute the settings for each frequency and push them to the device, one row after the other.
+
+    The computation of the next rows runs in a worker thread while the current row is being applied and confirmed,
+    and at most `queue_size` computed rows wait for the device.
+
+    Parameters
+    ----------
+    frequencies: list
+        Eigenfrequencies of the first capacity box, in the order of the scan.
+    device: CapacityBoxDevice
+    compute: callable, optional
+        Function computing the settings of a row from its frequency.
+        Defaults to `compute_settings`.
+    queue_size: int, optional
+        Maximum number of computed rows waiting to be applied.
+        Defaults to 2.
+
+    Returns
+    -------
+    results: list
+        List of (settings, confirmed) tuples, in the order of the scan.
+    timings: dict
+        Dictionary mapping the stages 'compute', 'wait', 'apply' and 'confirm' to the list of durations [s] of each
+        row, 'wait' being the time the device was idle waiting for the next computed row, 'intervals' to the
+        dictionary mapping the same stages to the list of (start, end) `time.perf_counter` values of each row, and
+        'total' to the total time of the scan.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_size)
+    timings = {'compute': list(), 'wait': list(), 'apply': list(), 'confirm': list()}
+    intervals = {stage: list() for stage in timings}
+    results = list()
+    end_of_scan = object()
+
+    def record(stage, start):
+        end = time.perf_counter()
+        timings[stage].append(end - start)
+        intervals[stage].append((start, end))
+
+    async def producer():
+        for frequency in frequencies:
+            start = time.perf_counter()
+            settings = await loop.run_in_executor(None, compute, frequency)
+            record('compute', start)
+            await queue.put(settings)
+        await queue.put(end_of_scan)
+
+    async def consumer():
+        while True:
+            start = time.perf_counter()
+            settings = await queue.get()
+            if settings is end_of_scan:
+                return
+            record('wait', start)
+
+            start = time.perf_counter()
+            await device.apply(settings)
+            record('apply', start)
+
+            start = time.perf_counter()
+            confirmed = await device.confirm(settings)
+            record('confirm', start)
+
+            results.append((settings, confirmed))
+
+    start_scan = time.perf_counter()
+    await asyncio.gather(producer(), consumer())
+    timings['total'] = time.perf_counter() - start_scan
+    timings['intervals'] = intervals
+
+    return results, timings
+
+
+def main():
+    from scripts.hardware.device import SimulatedDevice
+
+    frequencies = [30000 * 1.2 ** i for i in range(20)]
+    results, timings = asyncio.run(run_scan(frequencies, SimulatedDevice()))
+
+    for stage in ('compute', 'wait', 'apply', 'confirm'):
+        print(f'{stage}: {sum(timings[stage]):.3f} s')
+    print(f'total: {timings["total"]:.3f} s, all confirmed: {all(confirmed for _, confirmed in results)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,8 @@ computed_params = [1.68514381e+00, 4.72453838e-01, 1.42870779e-10, -1.14410010e+
 capacity_box_1_list = [20, 44, 94, 200, 440, 940]
 capacity_box_2_list = [0.44, 0.94, 2, 4.4, 9.40]
 capacity_box_3_list = [0.044, 0.066, 0.094, 0.200]
+# Relative tolerance of the single capacitors in the boxes.
+capacity_tolerance = 0.05
 
 inductance = 22.45e-6  # [H]
 mass_neutron = 1.674927471e-27  # [kg]
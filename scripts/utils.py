@@ -11,6 +11,9 @@
 import csv
 import numpy as np
 
+# Column names of the capacities table.
+capacities_header = ["capacity", "c1_box_index", "c2_box_index", "c3_box_index", "connection_type"]
+
 
 def add_inverse(a, b):
     """Adds two values as a parallel connection.
@@ -22,13 +25,21 @@ def add_inverse(a, b):
 
     Returns
     -------
-    out: float
-        the inverse of the sum of their inverses
+    out: float, ndarray
+        the inverse of the sum of their inverses, or 0 where any of them is 0.
     """
-    if a and b:
-        return (a**(-1) + b**(-1))**(-1)
-    else:
-        return 0
+    if np.ndim(a) == 0 and np.ndim(b) == 0:
+        if a and b:
+            return (a**(-1) + b**(-1))**(-1)
+        else:
+            return 0
+
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    mask = (a != 0) & (b != 0)
+
+    out = np.zeros(a.shape)
+    out[mask] = (a[mask]**(-1) + b[mask]**(-1))**(-1)
+    return out
 
 
 def transform_frequency(eigenfrequency_value, prefactor=3.8/143000):
@@ -91,23 +102,33 @@ def convert_binary_to_decimal(binary_number):
     return decimal
 
 
-def read_data_from_file(file_name):
+def read_data_from_file(file_name, read_inductance=False, default_inductance=np.nan):
     """Read data from file.
 
     Parameters
     ----------
     file_name: str
         Name of the file to be read from.
+    read_inductance: bool, optional
+        Flag indicating whether to also return the measured inductance of each point, from the `L` column.
+        Defaults to False.
+    default_inductance: float, optional
+        Inductance of the points without a valid measured one.
+        Defaults to nan.
     """
     _frequency = list()
     _capacity_1 = list()
     _capacity_2 = list()
     connection_type = list()
+    _inductance = list()
 
     with open(file_name) as csv_file:
         csv_reader = csv.reader(csv_file, delimiter=',')
         line_count = 0
+        inductance_column = None
         for row in csv_reader:
+            if inductance_column is None and 'L' in row:
+                inductance_column = row.index('L')
             if row[1] and row[2] and row[3]:
                 if line_count == 0:
                     # print(f'Column names are {", ".join(row)}')
@@ -122,6 +143,16 @@ def read_data_from_file(file_name):
                     except IndexError:
                         print("wtf")
 
+                    try:
+                        _inductance.append(float(row[inductance_column]))
+                    except (IndexError, TypeError, ValueError):
+                        # Missing column, or cells such as '#DIV/0!'
+                        _inductance.append(default_inductance)
+
+        if read_inductance:
+            return np.asarray(_frequency), np.asarray(_capacity_1), np.asarray(_capacity_2), \
+                   np.asarray(connection_type), np.asarray(_inductance, dtype=float)
+
         return np.asarray(_frequency), np.asarray(_capacity_1), np.asarray(_capacity_2), np.asarray(connection_type)
 
 
@@ -173,9 +204,127 @@ def save_capacities_data_to_file(data, file_name, extension='.csv'):
     with open(full_filename, 'w') as file:
 
         csv_writer = csv.writer(file, delimiter=',')
-        csv_writer.writerow(["capacity", "c1_box_index", "c2_box_index", "c3_box_index", "connection_type"])
+        csv_writer.writerow(capacities_header)
 
         for capacity, connection_data in data.items():
             row = list((capacity, connection_data[0], connection_data[1], connection_data[2], connection_data[3]))
 
             csv_writer.writerow(row)
+
+
+def capacities_data_to_columns(data):
+    """Convert the capacities data to whole columns.
+
+    Parameters
+    ----------
+    data: dict
+        Dictionary mapping the capacity to the tuple of box indexes and connection type.
+
+    Returns
+    -------
+    columns: dict
+        Dictionary mapping the names in `capacities_header` to ndarrays.
+    """
+    capacities = np.fromiter(data.keys(), dtype=float, count=len(data))
+    connection_data = np.asarray(list(data.values())).reshape(len(data), 4)
+
+    columns = {capacities_header[0]: capacities}
+    for i, name in enumerate(capacities_header[1:]):
+        columns[name] = connection_data[:, i]
+    return columns
+
+
+def save_columns_to_file(columns, file_name, file_format='npz'):
+    """Save whole columns to a columnar file.
+
+    Parameters
+    ----------
+    columns: dict
+        Dictionary mapping the column names to array-likes, in the order of the columns.
+    file_name: str
+        Name of the file to be written to.
+    file_format: str, optional
+        Either 'npz' for compressed numpy archives, or 'parquet' or 'arrow', which require pyarrow.
+        Defaults to 'npz'.
+
+    Returns
+    -------
+    full_filename: str
+        Name of the written file.
+    """
+    extension = f'.{file_format}'
+    if extension in file_name:
+        full_filename = file_name
+    else:
+        full_filename = f'{file_name}{extension}'
+
+    columns = {name: np.asarray(values) for name, values in columns.items()}
+
+    if file_format == 'npz':
+        np.savez_compressed(full_filename, **columns)
+    elif file_format in ('parquet', 'arrow'):
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError(f'pyarrow is needed to save to {file_format} files.')
+
+        table = pyarrow.table(columns)
+        if file_format == 'parquet':
+            import pyarrow.parquet
+            pyarrow.parquet.write_table(table, full_filename)
+        else:
+            with pyarrow.OSFile(full_filename, 'wb') as sink:
+                with pyarrow.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+    else:
+        raise ValueError(f'Unknown file format: {file_format}')
+
+    return full_filename
+
+
+def read_columns_from_file(file_name):
+    """Read whole columns from a file written by `save_columns_to_file`.
+
+    Parameters
+    ----------
+    file_name: str
+        Name of the file to be read from, the format is taken from its extension.
+
+    Returns
+    -------
+    columns: dict
+        Dictionary mapping the column names to ndarrays, in the order of the columns.
+    """
+    if file_name.endswith('.npz'):
+        with np.load(file_name) as data:
+            return {name: data[name] for name in data.files}
+    elif file_name.endswith('.parquet') or file_name.endswith('.arrow'):
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError(f'pyarrow is needed to read {file_name}.')
+
+        if file_name.endswith('.parquet'):
+            import pyarrow.parquet
+            table = pyarrow.parquet.read_table(file_name)
+        else:
+            with pyarrow.memory_map(file_name) as source:
+                table = pyarrow.ipc.open_file(source).read_all()
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    else:
+        raise ValueError(f'Unknown file format: {file_name}')
+
+
+def save_capacities_data_to_columnar_file(data, file_name, file_format='npz'):
+    """Save the capacities data to a columnar file, with the columns of `capacities_header`.
+
+    Parameters
+    ----------
+    data: dict
+        Dictionary mapping the capacity to the tuple of box indexes and connection type.
+    file_name: str
+    file_format: str, optional
+        See `save_columns_to_file`.
+        Defaults to 'npz'.
+    """
+    return save_columns_to_file(capacities_data_to_columns(data), file_name, file_format)
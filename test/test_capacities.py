@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the array support of the capacity computations."""
+
+import numpy as np
+from unittest import TestCase
+
+from scripts.compute_values.capacities import compute_capacity, compute_capacity_values, compute_total_capacity
+from scripts.utils import add_inverse, read_data_from_file
+
+
+class TestCapacities(TestCase):
+
+    def test_add_inverse(self):
+        self.assertEqual(add_inverse(2, 2), 1)
+        self.assertEqual(add_inverse(0, 2), 0)
+        np.testing.assert_allclose(add_inverse(np.array([2, 0, 3]), np.array([2, 5, 0])), [1, 0, 0])
+
+    def test_compute_capacity(self):
+        c1 = np.array([5, 0, 3, 17, 62])
+        c2 = np.array([4, 5, 0, 9, 30])
+        c3 = np.array([0, 3, 0, 2, 14])
+        serial = np.array([1, 1, 1, 0, 0])
+
+        expected = [compute_capacity(*values) for values in zip(c1, c2, c3, serial)]
+        np.testing.assert_allclose(compute_capacity(c1, c2, c3, serial), expected, rtol=1e-14)
+
+        self.assertEqual(compute_capacity(5, 4, 0, 1), 1.9655172413793106e-09)
+
+    def test_compute_total_capacity(self):
+        c1 = np.array([1., 0, 2, 3])
+        c2 = np.array([2., 2, 0, 3])
+        c3 = np.array([3., 3, 1, 0])
+        serial = np.array([1, 1, 0, 0])
+
+        expected = [compute_total_capacity(*values) for values in zip(c1, c2, c3, serial)]
+        np.testing.assert_allclose(compute_total_capacity(c1, c2, c3, serial), expected)
+
+    def test_compute_capacity_values(self):
+        _, capacity_1, capacity_2, connection_type = read_data_from_file('data/data.csv')
+
+        expected = [compute_capacity(c1, c2, serial=serial) for c1, c2, serial in
+                    zip(capacity_1, capacity_2, connection_type)]
+        np.testing.assert_allclose(compute_capacity_values(capacity_1, capacity_2, connection_type), expected,
+                                   rtol=1e-14)
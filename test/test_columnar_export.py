@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the columnar export of the tables."""
+
+import os
+import tempfile
+from importlib.util import find_spec
+from unittest import TestCase, skipUnless
+
+import numpy as np
+
+from scripts.analysis.compute_frequency_table import frequency_table_header, save_frequency_table_to_columnar_file
+from scripts.utils import capacities_header, read_columns_from_file, save_capacities_data_to_columnar_file
+
+
+class TestColumnarExport(TestCase):
+
+    data = {1.9655172413793106e-09: (5, 4, 0, 1), 4.4e-11: (62, 0, 1, 1), 0.0: (62, 0, 0, 1)}
+
+    def _round_trip(self, file_format):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = save_capacities_data_to_columnar_file(self.data, os.path.join(directory, 'capacities'),
+                                                              file_format)
+            columns = read_columns_from_file(file_name)
+
+        self.assertEqual(list(columns), capacities_header)
+        np.testing.assert_array_equal(columns['capacity'], list(self.data))
+        np.testing.assert_array_equal(columns['c1_box_index'], [5, 62, 62])
+        np.testing.assert_array_equal(columns['connection_type'], [1, 1, 1])
+
+    def test_npz(self):
+        self._round_trip('npz')
+
+        rows = [list(range(len(frequency_table_header))), list(range(1, len(frequency_table_header) + 1))]
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = save_frequency_table_to_columnar_file(rows, os.path.join(directory, 'table'))
+            columns = read_columns_from_file(file_name)
+
+        self.assertEqual(list(columns), frequency_table_header)
+        np.testing.assert_array_equal(columns['sf2'], [36, 37])
+
+    @skipUnless(find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_arrow(self):
+        self._round_trip('parquet')
+        self._round_trip('arrow')
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the instrument configurations."""
+
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from scripts.analysis.find_best_capacity_index import find_best_capacity_values, read_sorted_capacities
+from scripts.configuration import InstrumentConfiguration, default_configuration
+from scripts.compute_values.capacities import compute_capacity
+from scripts.parameters import computed_params
+
+
+class TestConfiguration(TestCase):
+
+    def test_default_configuration(self):
+        for c1, c2, c3, serial in ((5, 4, 0, 1), (3, 0, 0, 1), (0, 5, 3, 1), (17, 9, 2, 0)):
+            np.testing.assert_allclose(default_configuration.compute_capacity(c1, c2, c3, serial)[0],
+                                       compute_capacity(c1, c2, c3, serial), rtol=1e-12)
+
+        desired = np.array([5.7e-11, 1e-9, 2.1e-8])
+        best_capacities, _, connection_data = default_configuration.find_best_capacity_values(desired)
+        expected_capacities, _, expected_connection_data = find_best_capacity_values(desired)
+        np.testing.assert_allclose(best_capacities, expected_capacities, rtol=1e-12)
+        np.testing.assert_array_equal(connection_data, expected_connection_data)
+
+    def test_capacity_index(self):
+        capacities, connection_data = InstrumentConfiguration().capacity_index
+        expected_capacities, expected_connection_data = read_sorted_capacities()
+
+        self.assertTrue(np.all(np.diff(capacities) > 0))
+        np.testing.assert_array_equal(connection_data, expected_connection_data)
+        np.testing.assert_allclose(capacities, expected_capacities, rtol=1e-15)
+
+    def test_concurrent_configurations(self):
+        configurations = [InstrumentConfiguration(name='arm_a'),
+                          InstrumentConfiguration(capacity_box_1_list=[22, 47, 100, 220, 470, 1000],
+                                                  inductance=30e-6, name='arm_b')]
+        frequencies = np.linspace(40000, 900000, 50)
+
+        expected = [configuration.lookup(frequencies)[0] for configuration in
+                    [InstrumentConfiguration(name='arm_a'),
+                     InstrumentConfiguration(capacity_box_1_list=[22, 47, 100, 220, 470, 1000], inductance=30e-6)]]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda i: (i % 2, configurations[i % 2].lookup(frequencies)[0]), range(16)))
+
+        for i, result in results:
+            np.testing.assert_array_equal(result, expected[i])
+        self.assertFalse(np.allclose(expected[0], expected[1]))
+
+    def test_fitted_params(self):
+        configuration = InstrumentConfiguration()
+        params = configuration.fitted_params()
+
+        np.testing.assert_allclose(params, computed_params, rtol=1e-4)
+        self.assertIs(configuration.fitted_params(), params)
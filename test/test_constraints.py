@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the hardware constraints."""
+
+from unittest import TestCase
+
+import numpy as np
+
+from scripts.analysis.compute_all_capacity_values import enumerate_combinations
+from scripts.analysis.constraints import ConstrainedCapacityTable, HardwareConstraints
+from scripts.compute_values.capacities import compute_capacity
+from scripts.utils import convert_decimal_to_binary
+
+
+class TestConstraints(TestCase):
+
+    table = ConstrainedCapacityTable()
+
+    def test_mask(self):
+        constraints = HardwareConstraints(forbidden_bits=((1,), (), (0, 2)), absent_boxes=(2,),
+                                          allowed_connection_types=(0,), max_active_relays=3)
+        capacities, connection_data = self.table.subset(constraints)
+
+        self.assertGreater(len(capacities), 0)
+        for c1, c2, c3, serial in connection_data.astype(int):
+            self.assertFalse(c1 & 2)
+            self.assertEqual(c2, 0)
+            self.assertFalse(c3 & 5)
+            self.assertEqual(serial, 0)
+            active = sum(convert_decimal_to_binary(index).count('1') for index in (c1, c2, c3))
+            self.assertLessEqual(active, 3)
+
+        # The compiled subset is cached per constraint set
+        self.assertIs(self.table.subset(HardwareConstraints(forbidden_bits=((1,), (), (0, 2)), absent_boxes=(2,),
+                                                            allowed_connection_types=(0,), max_active_relays=3)),
+                      self.table.subset(constraints))
+
+    def test_queries(self):
+        constraints = HardwareConstraints(allowed_connection_types=(1,), max_active_relays=4)
+        capacities, _ = self.table.subset(constraints)
+        desired = np.array([0, 5.7e-11, 1e-9, 3.3e-8, 1])
+
+        best_capacities, errors, _ = self.table.find_nearest(desired, constraints)
+        top_capacities, top_errors, connection_data = self.table.find_top_k(desired, 4, constraints)
+
+        for i, value in enumerate(desired):
+            expected = np.sort(np.abs(capacities - value))[:4]
+            np.testing.assert_allclose(top_errors[i], expected)
+            self.assertAlmostEqual(errors[i], expected[0])
+        self.assertTrue(np.all(connection_data[..., 3] == 1))
+
+    def test_full_enumeration(self):
+        constraints = HardwareConstraints(absent_boxes=(1,))
+        capacities, connection_data = self.table.subset(constraints)
+
+        all_capacities = compute_capacity(*enumerate_combinations())
+        allowed = enumerate_combinations()[0] == 0
+        self.assertEqual(len(capacities), len(np.unique(all_capacities[allowed])))
+        self.assertTrue(np.all(connection_data[:, 0] == 0))
+
+        best_capacities, errors, connection_data = self.table.find_nearest(4.4e-11, constraints)
+        self.assertAlmostEqual(best_capacities[0], 4.4e-11, places=20)
+        self.assertAlmostEqual(compute_capacity(*connection_data[0]), best_capacities[0], places=20)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the coverage analysis."""
+
+from unittest import TestCase
+
+import numpy as np
+
+from scripts.analysis.coverage import achievable_frequencies, band_errors, best_frequency_error, find_gaps, \
+    rank_additional_capacitors, total_gap_width
+
+
+class TestCoverage(TestCase):
+
+    frequencies = achievable_frequencies()
+
+    def test_gaps(self):
+        tolerance = 1e-2
+        gaps = find_gaps(self.frequencies, tolerance)
+
+        grid = np.geomspace(30000, 1000000, 100000)
+        uncovered = best_frequency_error(self.frequencies, grid) > tolerance
+        in_gap = np.any((grid[:, np.newaxis] > gaps[:, 0]) & (grid[:, np.newaxis] < gaps[:, 1]), axis=1)
+
+        np.testing.assert_array_equal(uncovered[1:-1], in_gap[1:-1])
+
+    def test_band_errors(self):
+        grid = np.geomspace(30000, 1000000, 100000)
+        band_edges, worst_error, mean_error = band_errors(self.frequencies, n_bands=10)
+
+        self.assertEqual(len(band_edges), 11)
+        self.assertAlmostEqual(worst_error.max(), best_frequency_error(self.frequencies, grid).max(), places=4)
+        self.assertTrue(np.all(mean_error <= worst_error))
+
+    def test_ranking(self):
+        ranking = rank_additional_capacitors([0.01, 5, 20], 1e-2)
+
+        self.assertEqual(len(ranking), 9)
+        self.assertLessEqual(ranking[0][2], total_gap_width(self.frequencies, 1e-2))
+        self.assertEqual(sorted(item[2] for item in ranking), [item[2] for item in ranking])
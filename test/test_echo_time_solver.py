@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the echo time solver."""
+
+import numpy as np
+from unittest import TestCase
+
+from scripts.analysis.compute_frequency_table import chopping_frequency, compute_frequency2_from_frequency1, \
+    echo_time_scale, mieze_time
+from scripts.analysis.echo_time_solver import solve_echo_times
+from scripts.analysis.find_best_capacity_index import find_best_capacity_value, find_best_capacity_values
+
+
+class TestEchoTimeSolver(TestCase):
+
+    def test_vectorized_lookup(self):
+        desired = np.array([5.7391304347826082e-11, 1e-9, 3.3e-8, 2e-7])
+        best_capacities, errors, connection_data = find_best_capacity_values(desired)
+
+        for i, capacity in enumerate(desired):
+            best_capacity, error, single_connection_data = find_best_capacity_value(capacity)
+            np.testing.assert_allclose(best_capacities[i], best_capacity, rtol=1e-12)
+            np.testing.assert_allclose(errors[i], error, rtol=1e-12, atol=1e-25)
+            np.testing.assert_array_equal(connection_data[i], single_connection_data)
+
+        self.assertEqual(connection_data.shape, (4, 4))
+
+    def test_inverse(self):
+        frequency1 = np.array([30000, 100000, 250000])
+        echo_times = mieze_time(chopping_frequency(frequency1, compute_frequency2_from_frequency1(frequency1)))
+
+        solved_frequency1, *_, achieved, errors = solve_echo_times(echo_times * echo_time_scale)
+
+        np.testing.assert_allclose(solved_frequency1, frequency1)
+        np.testing.assert_allclose(achieved - echo_times * echo_time_scale, errors)
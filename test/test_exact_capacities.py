@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the exact capacities arithmetic."""
+
+from fractions import Fraction
+from unittest import TestCase
+
+import numpy as np
+
+from scripts.analysis.compute_all_capacity_values import unique_combinations
+from scripts.analysis.find_best_capacity_index import read_capacities
+from scripts.compute_values.capacities import combine_box_capacities_exact, compute_capacity, \
+    exact_capacity_sort_key, exact_capacity_to_float
+
+
+class TestExactCapacities(TestCase):
+
+    def test_combination(self):
+        numerator, denominator = combine_box_capacities_exact([300, 300, 0, 300, 200], [600, 600, 600, 600, 0],
+                                                              [0, 0, 0, 100, 50], [0, 1, 1, 1, 1])
+        expected = [Fraction(900), Fraction(200), Fraction(0), Fraction(200 * 100, 300), Fraction(50)]
+        self.assertEqual([Fraction(int(n), int(d)) for n, d in zip(numerator, denominator)], expected)
+
+    def test_sort_key(self):
+        numerator, denominator, _ = unique_combinations()
+        key, shift = exact_capacity_sort_key(numerator, denominator)
+
+        order = np.argsort(key)
+        self.assertEqual(len(np.unique(key)), len(key))
+        values = [Fraction(int(numerator[i]), int(denominator[i])) for i in order]
+        self.assertTrue(all(a < b for a, b in zip(values[:-1], values[1:])))
+
+    def test_capacities_table(self):
+        numerator, denominator, connection_data = unique_combinations()
+        capacities, c1, c2, c3, connection_type = read_capacities()
+
+        np.testing.assert_array_equal(connection_data, np.column_stack((c1, c2, c3, connection_type)))
+        np.testing.assert_allclose(exact_capacity_to_float(numerator, denominator), capacities, rtol=1e-15)
+        np.testing.assert_allclose(exact_capacity_to_float(numerator, denominator),
+                                   compute_capacity(*connection_data.T), rtol=1e-15)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the cache of the eigenfrequency requests."""
+
+from unittest import TestCase
+
+import numpy as np
+
+import main
+from scripts import parameters
+from scripts.analysis.find_best_capacity_index import compute_index
+from scripts.compute_values.eigenfrequency_capacity import compute_capacity_for_given_eigenfrequency
+from scripts.frequency_cache import FrequencyCache
+from scripts.parameters import computed_params
+
+
+class TestFrequencyCache(TestCase):
+
+    def test_counters(self):
+        calls = list()
+        cache = FrequencyCache(maxsize=2, resolution=10)
+
+        def compute(frequency):
+            calls.append(frequency)
+            return frequency * 2
+
+        self.assertEqual(cache.get(1002, compute), 2000)
+        self.assertEqual(cache.get(998, compute), 2000)
+        cache.get(2000, compute)
+        cache.get(3000, compute)
+        cache.get(1000, compute)
+
+        self.assertEqual(calls, [1000, 2000, 3000, 1000])
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 4, 2))
+        self.assertEqual(len(cache), 2)
+
+    def test_invalidation(self):
+        cache = FrequencyCache()
+        compute = lambda frequency: parameters.computed_params[0] * frequency
+
+        old_params = parameters.computed_params
+        self.assertEqual(cache.get(1000, compute), old_params[0] * 1000)
+        try:
+            parameters.computed_params = [2 * old_params[0], *old_params[1:]]
+            self.assertEqual(cache.get(1000, compute), 2 * old_params[0] * 1000)
+        finally:
+            parameters.computed_params = old_params
+
+        self.assertEqual(cache.invalidations, 1)
+        self.assertEqual(cache.hits, 0)
+
+    def test_recalibration(self):
+        numerical_values, _ = main.main(200000)
+
+        old_inductance = parameters.inductance
+        try:
+            parameters.inductance = 2 * old_inductance
+            new_numerical_values, _ = main.main(200000)
+        finally:
+            parameters.inductance = old_inductance
+        self.assertNotEqual(new_numerical_values[:4], numerical_values[:4])
+
+        old_box_list = parameters.capacity_box_2_list
+        try:
+            parameters.capacity_box_2_list = [2 * value for value in old_box_list]
+            new_numerical_values, _ = main.main(200000)
+        finally:
+            parameters.capacity_box_2_list = old_box_list
+        self.assertNotEqual(new_numerical_values[:4], numerical_values[:4])
+
+        self.assertEqual(main.main(200000)[0], numerical_values)
+
+    def test_baseline_output(self):
+        for frequency in (40000, 200000, 713000):
+            capacity = compute_capacity_for_given_eigenfrequency(frequency, computed_params)
+            expected = compute_index(capacity)
+
+            self.assertEqual(main.main(frequency), expected)
+
+        old_box_list = parameters.capacity_box_2_list
+        try:
+            parameters.capacity_box_2_list = [2 * value for value in old_box_list]
+            numerical_values, message = main.main(200000)
+        finally:
+            parameters.capacity_box_2_list = old_box_list
+        self.assertIsInstance(numerical_values[3], (int, np.integer))
+        self.assertRegex(message, 'Connected in serial: [01]\n')
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the pipelined push of the settings to the capacity boxes."""
+
+import asyncio
+import time
+from unittest import TestCase
+
+from scripts.analysis.compute_frequency_table import frequency_table_header
+from scripts.hardware.device import CapacityBoxDevice, SimulatedDevice
+from scripts.hardware.pipeline import compute_settings, run_scan
+
+
+def slow_compute(frequency):
+    time.sleep(0.02)
+    return {'cbox1_fg_freq': frequency}
+
+
+class TestHardwarePipeline(TestCase):
+
+    def test_compute_settings(self):
+        settings = compute_settings(100000)
+        self.assertTrue(set(settings).issubset(frequency_table_header))
+        self.assertEqual(settings['cbox2_fg_freq'], 120000)
+
+    def test_rows_confirmed_in_order(self):
+        frequencies = [30000 * 1.5 ** i for i in range(5)]
+        device = SimulatedDevice(apply_time=0.001, confirm_time=0.001)
+        results, timings = asyncio.run(run_scan(frequencies, device))
+
+        self.assertEqual([settings['cbox1_fg_freq'] for settings, _ in results], [round(f) for f in frequencies])
+        self.assertTrue(all(confirmed for _, confirmed in results))
+        self.assertEqual(device.history, [settings for settings, _ in results])
+        self.assertEqual(len(timings['apply']), len(frequencies))
+
+    def test_overlap(self):
+        frequencies = list(range(10))
+        device = SimulatedDevice(apply_time=0.015, confirm_time=0.01)
+        results, timings = asyncio.run(run_scan(frequencies, device, compute=slow_compute, queue_size=1))
+
+        self.assertEqual(len(results), len(frequencies))
+        intervals = timings['intervals']
+        for i in range(len(frequencies) - 1):
+            # The next row is being computed while the current one is on the device
+            self.assertLess(intervals['compute'][i + 1][0], intervals['confirm'][i][1])
+            self.assertLessEqual(intervals['apply'][i][1], intervals['confirm'][i][0])
+            self.assertLessEqual(intervals['confirm'][i][1], intervals['apply'][i + 1][0])
+
+    def test_incomplete_device(self):
+        class ApplyOnlyDevice(CapacityBoxDevice):
+            async def apply(self, settings):
+                pass
+
+        with self.assertRaises(TypeError):
+            ApplyOnlyDevice()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Regression checks for the start up time of the lookup path."""
+
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+# Maximum cumulative import time of main.py [s]
+import_time_budget = 1.0
+
+root_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code):
+    """Run the code in a fresh interpreter from the root of the repository and return its stdout and stderr."""
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=root_directory,
+                             capture_output=True, text=True, check=True)
+    return process.stdout, process.stderr
+
+
+class TestImportTime(TestCase):
+
+    def test_no_heavy_imports(self):
+        stdout, _ = run_python('import sys, main\n'
+                               'print(sorted({name.split(".")[0] for name in sys.modules} & '
+                               '{"matplotlib", "scipy", "pyarrow"}))')
+        self.assertEqual(stdout.strip(), '[]')
+
+    def test_lazy_table(self):
+        stdout, _ = run_python('from scripts.analysis.find_best_capacity_index import read_capacities\n'
+                               'print(read_capacities.cache_info().currsize)')
+        self.assertEqual(stdout.strip(), '0')
+
+    def test_import_time_budget(self):
+        _, stderr = run_python('import main')
+
+        for line in stderr.splitlines():
+            if line.endswith('| main'):
+                cumulative_time = int(line.split('|')[1]) * 1e-6
+                break
+        else:
+            self.fail('main was not imported')
+
+        self.assertLess(cumulative_time, import_time_budget)
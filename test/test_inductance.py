@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the measured inductance of each point."""
+
+from unittest import TestCase
+
+import numpy as np
+
+from scripts.analysis.optimize import fit_eigen_frequency
+from scripts.compute_values.capacities import compute_capacity_values, parasitic_capacity_calculation
+from scripts.compute_values.eigenfrequency_capacity import compute_capacity_for_given_eigenfrequency, \
+    compute_eigen_frequency
+from scripts.configuration import InstrumentConfiguration
+from scripts.parameters import computed_params, inductance
+from scripts.utils import read_data_from_file
+
+
+class TestInductance(TestCase):
+
+    def test_read_inductance(self):
+        frequency, _, _, _ = read_data_from_file('data/data.csv')
+        _, _, _, _, inductance_values = read_data_from_file('data/data.csv', read_inductance=True)
+        self.assertEqual(len(inductance_values), len(frequency))
+        self.assertIn(2.39063582421847e-05, inductance_values)
+
+        _, _, _, _, inductance_values = read_data_from_file('data/data.csv', read_inductance=True,
+                                                            default_inductance=inductance)
+        self.assertTrue(np.all(np.isfinite(inductance_values)))
+
+    def test_fit_with_inductance_per_point(self):
+        _, capacity_1, capacity_2, connection_type = read_data_from_file('data/data.csv')
+        capacity_values = compute_capacity_values(capacity_1, capacity_2, connection_type)
+        inductance_values = inductance * np.random.default_rng(0).uniform(0.9, 1.1, len(capacity_values))
+
+        measured_frequency = compute_eigen_frequency(capacity_values, *computed_params,
+                                                     inductance_value=inductance_values)
+        params = fit_eigen_frequency(capacity_values, measured_frequency, p0=computed_params,
+                                     inductance_value=inductance_values)
+        np.testing.assert_allclose(params, computed_params, rtol=1e-4)
+
+    def test_lookup_with_inductance_array(self):
+        frequency = np.array([50000., 200000., 200000.])
+        inductance_values = np.array([inductance, inductance, 1.1 * inductance])
+
+        capacity = compute_capacity_for_given_eigenfrequency(frequency, inductance_value=inductance_values)
+        for i in range(len(frequency)):
+            self.assertAlmostEqual(capacity[i], compute_capacity_for_given_eigenfrequency(
+                frequency[i], inductance_value=inductance_values[i]), places=20)
+
+        configuration = InstrumentConfiguration()
+        _, _, connection_data = configuration.lookup(frequency, inductance_values)
+        np.testing.assert_array_equal(connection_data[:2], configuration.lookup(frequency[:2])[2])
+        self.assertFalse(np.array_equal(connection_data[1], connection_data[2]))
+
+        np.testing.assert_allclose(parasitic_capacity_calculation(capacity, frequency, 'serial', inductance_values),
+                                   (2 * np.pi * frequency) ** -2 / inductance_values - capacity)
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the joint search over both coils."""
+
+from unittest import TestCase
+
+import numpy as np
+
+from scripts.analysis.find_best_capacity_index import find_best_capacity_value, read_sorted_capacities
+from scripts.analysis.joint_coil_search import compute_pair_index, find_best_capacity_pair
+from scripts.compute_values.capacities import compute_capacity
+
+
+class TestJointCoilSearch(TestCase):
+
+    def test_brute_force(self):
+        capacities, connection_data = read_sorted_capacities()
+        subset = np.sort(np.random.default_rng(0).choice(capacities, 2000, replace=False))
+
+        for desired in (1e-10, 3.3e-9, 2.5e-8, 1.3e-6, 5e-6):
+            _, error, _, _ = find_best_capacity_pair(desired, subset, np.zeros((len(subset), 4)))
+            self.assertAlmostEqual(error, np.abs(subset[:, np.newaxis] + subset - desired).min(), places=20)
+
+    def test_pair_index(self):
+        desired = 2.7e-8
+        indexes_coil_1, indexes_coil_2, remainder = compute_pair_index(desired)
+
+        total = sum(compute_capacity(*(int(index) for index in indexes))
+                    for indexes in (indexes_coil_1, indexes_coil_2))
+        self.assertAlmostEqual(abs(total - desired), remainder, places=20)
+        self.assertLessEqual(remainder, find_best_capacity_value(desired)[1])
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the incremental refit."""
+
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from scripts.analysis.online_refit import OnlineCalibration
+from scripts.compute_values.capacities import compute_capacity
+from scripts.compute_values.eigenfrequency_capacity import compute_eigen_frequency
+from scripts.parameters import computed_params
+from scripts.utils import read_data_from_file
+
+
+class TestOnlineRefit(TestCase):
+
+    def test_incremental_refit(self):
+        frequency, capacity_1, capacity_2, connection_type = read_data_from_file('data/data.csv')
+
+        with tempfile.TemporaryDirectory() as directory:
+            store_file = os.path.join(directory, 'store.csv')
+            calibration = OnlineCalibration(threshold=1e-6, store_file=store_file)
+
+            calibration.add_points(frequency[:10], capacity_1[:10], capacity_2[:10], connection_type[:10])
+            for i in range(10, len(frequency)):
+                calibration.add_points(frequency[i], capacity_1[i], capacity_2[i], connection_type[i])
+
+            np.testing.assert_allclose(calibration.params, computed_params, rtol=1e-4)
+
+            # The store file holds all the points for the next session
+            reloaded = OnlineCalibration(store_file=store_file)
+            np.testing.assert_array_equal(reloaded.frequency, frequency)
+
+    def test_threshold(self):
+        calibration = OnlineCalibration(threshold=1, data_file='data/data.csv')
+        table_frequency = calibration.table_frequency
+
+        self.assertFalse(calibration.refit())
+        self.assertIs(calibration.table_frequency, table_frequency)
+        np.testing.assert_array_equal(calibration.params, computed_params)
+
+    def test_lookup(self):
+        calibration = OnlineCalibration()
+        eigenfrequency = np.linspace(40000, 900000, 50)
+        best_capacities, errors, connection_data = calibration.lookup(eigenfrequency)
+
+        predicted = compute_eigen_frequency(best_capacities, *computed_params)
+        np.testing.assert_allclose(errors, np.abs(predicted - eigenfrequency))
+        np.testing.assert_array_equal(best_capacities, compute_capacity(*connection_data.T))
+
+        # No other row of the table predicts a closer frequency
+        with np.errstate(invalid='ignore'):
+            table_frequency = compute_eigen_frequency(calibration.capacities, *computed_params)
+        expected = np.nanmin(np.abs(table_frequency[:, np.newaxis] - eigenfrequency), axis=0)
+        np.testing.assert_allclose(errors, expected)
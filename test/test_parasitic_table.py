@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the parasitic capacity aware table."""
+
+from unittest import TestCase
+
+import numpy as np
+
+from scripts.analysis.parasitic_table import ParasiticCapacityTable
+from scripts.compute_values.capacities import add_parasitic_capacity, estimate_parasitic_capacity
+from scripts.parameters import inductance
+
+
+class TestParasiticTable(TestCase):
+
+    def test_estimate(self):
+        capacity_values = np.geomspace(1e-10, 1e-6, 30)
+
+        for connection_type in ('serial', 'parallel'):
+            effective_capacity = add_parasitic_capacity(capacity_values, 3e-10, connection_type)
+            measured_frequency = 1 / (2 * np.pi * np.sqrt(inductance * effective_capacity))
+
+            self.assertAlmostEqual(estimate_parasitic_capacity(capacity_values, measured_frequency, connection_type),
+                                   3e-10, places=15)
+
+    def test_table(self):
+        table = ParasiticCapacityTable()
+        capacities = table.capacities
+        np.testing.assert_array_equal(table.effective_capacities, capacities)
+
+        table.set_parasitic_capacity(5e-10, 'serial')
+        np.testing.assert_allclose(table.effective_capacities, capacities + 5e-10)
+        self.assertIs(table.capacities, capacities)
+
+        table.set_parasitic_capacity(5e-10, 'parallel')
+        self.assertTrue(np.all(np.diff(table.effective_capacities) >= 0))
+
+        best_capacities, errors, connection_data = table.find_best_capacity_values([1e-10, 2e-9])
+        np.testing.assert_allclose(errors, np.abs(best_capacities - [1e-10, 2e-9]))
+        self.assertEqual(connection_data.shape, (2, 4))
+
+    def assert_nearest(self, table, desired_capacities):
+        best_capacities, errors, _ = table.find_best_capacity_values(desired_capacities)
+        expected = np.abs(table.effective_capacities[:, np.newaxis] - desired_capacities).min(axis=0)
+        np.testing.assert_array_equal(errors, expected)
+
+    def test_measured_data(self):
+        desired_capacities = np.geomspace(1e-11, 2e-6, 200)
+
+        table = ParasiticCapacityTable(connection_type='parallel')
+        with self.assertRaises(ValueError):
+            table.estimate_parasitic_capacity('data/data.csv')
+        self.assertEqual(table.parasitic_capacity, 0)
+
+        table = ParasiticCapacityTable()
+        parasitic_capacity = table.estimate_parasitic_capacity('data/data.csv')
+        self.assertGreater(parasitic_capacity, 0)
+        self.assertTrue(np.all(np.diff(table.effective_capacities) >= 0))
+        self.assert_nearest(table, desired_capacities)
+
+    def test_zero_and_negative(self):
+        table = ParasiticCapacityTable(0, 'parallel')
+        np.testing.assert_array_equal(table.effective_capacities, table.capacities)
+
+        with self.assertRaises(ValueError):
+            table.set_parasitic_capacity(-1e-10, 'serial')
+        self.assertEqual(table.parasitic_capacity, 0)
+
+    def test_unsorted_table(self):
+        table = ParasiticCapacityTable()
+        order = np.random.default_rng(0).permutation(len(table.capacities))
+        table = ParasiticCapacityTable(5e-10, 'parallel', table.capacities[order], table.connection_data[order])
+
+        self.assert_nearest(table, np.geomspace(1e-11, 2e-6, 200))
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the headless diagnostic plots."""
+
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from scripts.analysis.plot_diagnostics import bin_values, render_diagnostics
+
+
+class TestPlotDiagnostics(TestCase):
+
+    def test_bin_values(self):
+        x = np.geomspace(1e-11, 1e-6, 57000)
+        y = 1 / np.sqrt(x)
+
+        x_mean, y_mean, y_min, y_max = bin_values(x, y, n_bins=100)
+
+        self.assertLessEqual(len(x_mean), 100)
+        self.assertTrue(np.all(y_min <= y_mean) and np.all(y_mean <= y_max))
+        self.assertEqual(y_max.max(), y.max())
+        self.assertEqual(y_min.min(), y.min())
+
+    def test_render_diagnostics(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_names = render_diagnostics(directory, n_bins=50, n_workers=2)
+
+            self.assertIn(os.path.join(directory, 'capacity_vs_eigenfrequency.png'), file_names)
+            for file_name in file_names:
+                self.assertGreater(os.path.getsize(file_name), 0)
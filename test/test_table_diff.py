@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the differential regeneration of the frequency tables."""
+
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from scripts.analysis.table_diff import diff_frequency_table, index_columns, patch_frequency_table, \
+    read_frequency_table
+from scripts.compute_values.capacities import compute_capacity
+
+
+class TestTableDiff(TestCase):
+
+    def test_generated_table_unchanged(self):
+        header, rows = read_frequency_table('data/generated_table_data.csv')
+        patched_rows, flagged, _ = diff_frequency_table(header, rows)
+
+        self.assertFalse(np.any(flagged))
+        self.assertEqual(patched_rows, rows)
+
+    def test_patch_deployed_table(self):
+        header, rows = read_frequency_table('data/Tuning_final_A_mieze_4.34A.csv')
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_file_name, flagged, report = patch_frequency_table('data/Tuning_final_A_mieze_4.34A.csv',
+                                                                      os.path.join(directory, 'patched.csv'))
+            _, patched_rows = read_frequency_table(output_file_name)
+
+        self.assertTrue(np.any(flagged))
+        self.assertFalse(flagged[0])
+
+        index_names = {f'{box}_coil1_{name}' for box in ('cbox1', 'cbox2') for name in ('c1', 'c2', 'c3', 'c1c2serial')}
+        for row, patched_row, is_flagged in zip(rows, patched_rows, flagged):
+            for name, value, patched_value in zip(header, row, patched_row):
+                if not is_flagged or name not in index_names:
+                    self.assertEqual(value, patched_value)
+
+        for values in report.values():
+            changed = values['changed']
+            self.assertTrue(np.all(np.abs(values['new_error'][changed]) < np.abs(values['old_error'][changed])))
+
+        _, flagged_again, _ = diff_frequency_table(header, patched_rows)
+        self.assertFalse(np.any(flagged_again))
+
+    def test_zero_capacity(self):
+        header, rows = read_frequency_table('data/Tuning_final_A_mieze_4.34A.csv')
+        patched_rows, flagged, report = diff_frequency_table(header, rows)
+
+        # In row 16, coil2 of cbox1 alone is closest to the tuned frequency
+        self.assertTrue(report['cbox1']['changed'][15])
+        self.assertEqual(report['cbox1']['new'][15].tolist(), [0, 0, 0, 0])
+        self.assertEqual([patched_rows[15][header.index(f'cbox1_coil1_{name}')] for name in index_columns],
+                         ['0', '0', '0', '0'])
+
+        for values in report.values():
+            zero_capacity = compute_capacity(*values['new'].T) == 0
+            self.assertTrue(np.all(values['new'][zero_capacity] == 0))
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of MIEZE simulation.
+# Copyright (C) 2019, 2020 TUM FRM2 E21 Research Group.
+#
+# This is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests for the Monte Carlo tolerance analysis."""
+
+import tracemalloc
+import numpy as np
+from unittest import TestCase
+
+from scripts.analysis.tolerance_analysis import find_robust_combination, monte_carlo_frequency_spread
+from scripts.compute_values.capacities import compute_capacity
+from scripts.compute_values.eigenfrequency_capacity import compute_eigen_frequency
+from scripts.parameters import computed_params
+
+
+class TestToleranceAnalysis(TestCase):
+
+    def test_spread(self):
+        combinations, nominal, mean, spread, minimum, maximum = monte_carlo_frequency_spread(
+            n_samples=50, chunk_size=10000, seed=0)
+
+        for i in (100, 2000, 30001, 58589):
+            c1, c2, c3, serial = (values[i] for values in combinations)
+            expected = compute_eigen_frequency(compute_capacity(c1, c2, c3, serial), *computed_params)
+            self.assertAlmostEqual(nominal[i], expected, places=3)
+
+        self.assertTrue(np.all(minimum <= mean) and np.all(mean <= maximum))
+        self.assertTrue(np.all(spread >= 0))
+
+        # Zero tolerance gives no spread at all
+        _, nominal, mean, spread, _, _ = monte_carlo_frequency_spread(n_samples=5, tolerance=0, seed=0)
+        np.testing.assert_allclose(mean, nominal)
+
+    def test_robust_combination(self):
+        spread_data = monte_carlo_frequency_spread(n_samples=50, seed=0)
+        connection_data, frequency, spread = find_robust_combination(200000, spread_data, max_error=1000)
+
+        self.assertEqual(len(connection_data), 4)
+        self.assertLess(abs(frequency - 200000), 1000)
+
+    def test_memory_budget(self):
+        memory_budget = 16 * 2 ** 20
+        tracemalloc.start()
+        try:
+            spread_data = monte_carlo_frequency_spread(n_samples=200, n_workers=2, seed=0, memory_budget=memory_budget)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # On top of the budget, a few arrays hold one value per combination
+        n_combinations = len(spread_data[0][0])
+        self.assertLess(peak, memory_budget + 16 * n_combinations * np.dtype(float).itemsize)
+
+        for values, expected in zip(spread_data[1:], monte_carlo_frequency_spread(n_samples=200, chunk_size=10000,
+                                                                                  seed=0)[1:]):
+            np.testing.assert_allclose(values, expected)